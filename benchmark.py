@@ -0,0 +1,162 @@
+"""
+Benchmark of reading, graph construction and all network properties on synthetic data of several scales.
+
+Each run is appended as json line to the result file and compared with the previous run of the same scale:
+python benchmark.py --result-file benchmark_results.jsonl
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import timeit
+
+import networkx as nx
+
+import data_reader_module
+import network_analysis as neta
+import synthetic_data
+
+# number of orders and machines of each scale
+SCALES = {
+    'small': (200, 10),
+    'medium': (2000, 30),
+    'large': (20000, 80),
+}
+
+# handled by the controller, the model provides the vertex property instead
+CONTROLLER_TYPES = [neta.Model.TYPE_AVG_CLUSTERING_COEFFICIENT, neta.Model.TYPE_AVG_LOCAL_EFFICIENCY,
+                    neta.Model.TYPE_WEIGHTED_AVG_LOCAL_EFFICIENCY]
+
+
+def property_types():
+    """All property types which can be added to a model"""
+    return sorted(getattr(neta.Model, name) for name in dir(neta.Model)
+                  if name.startswith('TYPE_') and getattr(neta.Model, name) not in CONTROLLER_TYPES)
+
+
+def _best_time(function, repeat):
+    """Minimal wall time of repeat calls of function"""
+    timings = []
+    for _ in range(repeat):
+        start = timeit.default_timer()
+        function()
+        timings.append(timeit.default_timer() - start)
+    return min(timings)
+
+
+def _iterate_orders(data):
+    for _ in data_reader_module.OrderIterator(data.get_orders()):
+        pass
+
+
+def _construct_graph(data, constructor_class, graph):
+    constructor = constructor_class(data, graph)
+    constructor.get_full_graph_projected()
+    return constructor
+
+
+def benchmark_scale(filename, repeat=3):
+    """Return the seconds of each benchmark on the data file"""
+    results = {}
+    results['loading'] = _best_time(lambda: data_reader_module.read_data_from_file(filename), repeat)
+    data = data_reader_module.read_data_from_file(filename)
+    results['order iterator'] = _best_time(lambda: _iterate_orders(data), repeat)
+    results['constructor networkx'] = _best_time(
+        lambda: _construct_graph(data, data_reader_module.NxGraphConstructor, nx.DiGraph()), repeat)
+    try:
+        import graph_tool
+        results['constructor graph-tool'] = _best_time(
+            lambda: _construct_graph(data, data_reader_module.GtGraphConstructor, graph_tool.Graph()), repeat)
+    except ImportError:
+        pass
+
+    for property_type in property_types():
+        graph = nx.DiGraph()
+        constructor = data_reader_module.NxGraphConstructor(data, graph)
+        model = neta.Model(graph, constructor)
+        try:
+            network_property = model.add_property(property_type)
+            # incrementally maintained properties are informed during the construction
+            start = timeit.default_timer()
+            constructor.get_full_graph_projected()
+            construction_seconds = timeit.default_timer() - start
+            model.actual_time = 1
+            results['property ' + property_type] = _best_time(network_property.update, repeat)
+            if hasattr(network_property, 'graph_changed'):
+                results['construction with ' + property_type] = construction_seconds
+        except Exception as error:
+            print 'benchmark of {0} failed: {1!r}'.format(property_type, error)
+    return results
+
+
+def _revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def read_results(result_file):
+    if not os.path.exists(result_file):
+        return []
+    with open(result_file) as results:
+        return [json.loads(line) for line in results if line.strip()]
+
+
+def compare(previous, actual, tolerance):
+    """Print every benchmark which is slower than the previous one by more than the tolerance"""
+    regressions = []
+    for name, seconds in sorted(actual['results'].iteritems()):
+        previous_seconds = previous['results'].get(name)
+        if previous_seconds and seconds > previous_seconds * (1 + tolerance):
+            regressions.append(name)
+            print 'regression {0} {1}: {2:.4f}s -> {3:.4f}s'.format(actual['scale'], name, previous_seconds,
+                                                                      seconds)
+    return regressions
+
+
+def run(scales, result_file, repeat=3, seed=1, tolerance=.5):
+    """Benchmark the given scales, append the results and return the names of regressions"""
+    previous_runs = read_results(result_file)
+    revision = _revision()
+    regressions = []
+    directory = tempfile.mkdtemp()
+    try:
+        for scale in scales:
+            number_of_orders, number_of_machines = SCALES[scale]
+            filename = os.path.join(directory, scale + '.csv')
+            synthetic_data.write_data_file(filename, number_of_orders=number_of_orders,
+                                           number_of_machines=number_of_machines, seed=seed)
+            actual = {'scale': scale, 'revision': revision, 'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+                      'orders': number_of_orders, 'machines': number_of_machines,
+                      'results': benchmark_scale(filename, repeat)}
+            with open(result_file, 'a') as results:
+                results.write(json.dumps(actual, sort_keys=True) + '\n')
+
+            for name, seconds in sorted(actual['results'].iteritems()):
+                print '{0:8} {1:60} {2:10.5f}s'.format(scale, name, seconds)
+            previous = [previous_run for previous_run in previous_runs if previous_run['scale'] == scale]
+            if previous:
+                regressions.extend(compare(previous[-1], actual, tolerance))
+    finally:
+        shutil.rmtree(directory)
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', nargs='+', default=['small', 'medium'], choices=sorted(SCALES))
+    parser.add_argument('--result-file', default='benchmark_results.jsonl')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--tolerance', type=float, default=.5,
+                        help='relative slowdown reported as regression')
+    arguments = parser.parse_args()
+    found_regressions = run(arguments.scales, arguments.result_file, arguments.repeat, arguments.seed,
+                            arguments.tolerance)
+    raise SystemExit(1 if found_regressions else 0)
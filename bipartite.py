@@ -0,0 +1,162 @@
+"""Two-mode order-machine network as sparse incidence matrix with projections as sparse matrix products"""
+
+import numpy as np
+
+from time_series import GrowableArray
+
+try:
+    import scipy.sparse
+except ImportError:
+    scipy = None
+
+
+class BipartiteIncidence(object):
+    """
+    Incidence matrix B of orders (rows) and machines (columns), B[o, m] is the number of steps of order o on machine m.
+
+    Rows and columns get stable indices in the order of the first step. The entries are appended as coordinate
+    arrays, each step changes one entry in O(1). The degrees of both modes are kept up to date.
+    The machine projection B^T B (number of common step pairs of two machines) is small and maintained densely for
+    every step. The order projection B B^T is calculated on demand as sparse product and afterwards only updated
+    for the orders with new steps. The sparse matrices need scipy.
+    Used as step listener of a graph constructor, see AbstractGraphConstructor.add_step_listener.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.orders = []
+        self.machines = []
+        self._order_index = {}
+        self._machine_index = {}
+        self._rows = GrowableArray(dtype=np.int64)
+        self._columns = GrowableArray(dtype=np.int64)
+        self._counts = GrowableArray()
+        # position of each (row, column) in the coordinate arrays
+        self._entry = {}
+        # column -> entry of each row for the incremental machine projection
+        self._order_columns = {}
+        # number of machines (orders) and number of steps of each order (machine)
+        self.order_degree = GrowableArray(dtype=np.int64)
+        self.order_steps = GrowableArray(dtype=np.int64)
+        self.machine_degree = GrowableArray(dtype=np.int64)
+        self.machine_steps = GrowableArray(dtype=np.int64)
+        self._machine_projection = np.zeros((0, 0))
+        self._order_projection = None
+        # rows changed since the order projection was calculated
+        self._changed_orders = set()
+
+    @property
+    def number_of_steps(self):
+        return int(self._counts.values.sum())
+
+    def step_read(self, order, step_index):
+        """Listener function of the graph constructor"""
+        self.add_step('O' + str(order.order_id), 'M' + str(order.steps[step_index][0]))
+
+    def add_step(self, order, machine):
+        row = self._order_index.get(order)
+        if row is None:
+            row = self._add_order(order)
+        column = self._machine_index.get(machine)
+        if column is None:
+            column = self._add_machine(machine)
+
+        entry = self._entry.get((row, column))
+        if entry is None:
+            self._entry[(row, column)] = len(self._counts)
+            self._rows.append(row)
+            self._columns.append(column)
+            self._counts.append(0)
+            entry = len(self._counts) - 1
+            self._order_columns[row][column] = entry
+            self.order_degree.values[row] += 1
+            self.machine_degree.values[column] += 1
+        self.order_steps.values[row] += 1
+        self.machine_steps.values[column] += 1
+
+        # (B + e_o e_m^T)^T (B + e_o e_m^T) = B^T B + b_o^T e_m^T + e_m b_o + e_m e_m^T with the old row b_o
+        counts = self._counts.values
+        for other_column, other_entry in self._order_columns[row].iteritems():
+            self._machine_projection[column, other_column] += counts[other_entry]
+            self._machine_projection[other_column, column] += counts[other_entry]
+        self._machine_projection[column, column] += 1
+        counts[entry] += 1
+        self._changed_orders.add(row)
+
+    def _add_order(self, order):
+        row = len(self.orders)
+        self._order_index[order] = row
+        self.orders.append(order)
+        self._order_columns[row] = {}
+        self.order_degree.append(0)
+        self.order_steps.append(0)
+        return row
+
+    def _add_machine(self, machine):
+        column = len(self.machines)
+        self._machine_index[machine] = column
+        self.machines.append(machine)
+        self.machine_degree.append(0)
+        self.machine_steps.append(0)
+        projection = np.zeros((column + 1, column + 1))
+        projection[:column, :column] = self._machine_projection
+        self._machine_projection = projection
+        return column
+
+    def incidence_matrix(self):
+        """Sparse matrix orders x machines"""
+        _check_scipy()
+        return scipy.sparse.csr_matrix((self._counts.values, (self._rows.values, self._columns.values)),
+                                       shape=(len(self.orders), len(self.machines)))
+
+    def machine_projection(self):
+        """Return the machines and the dense matrix B^T B"""
+        return list(self.machines), self._machine_projection.copy()
+
+    def order_projection(self):
+        """
+        Return the orders and the sparse matrix B B^T (number of common step pairs of two orders)
+        Only the rows and columns of the orders with new steps since the last call are recalculated.
+        """
+        incidence = self.incidence_matrix()
+        number_of_orders = len(self.orders)
+        projection = self._order_projection
+        if projection is None:
+            projection = (incidence * incidence.T).tocsr()
+        elif self._changed_orders:
+            changed = np.array(sorted(self._changed_orders), dtype=np.int64)
+            old = projection.tocoo()
+            projection = scipy.sparse.csr_matrix((old.data, (old.row, old.col)),
+                                                 shape=(number_of_orders, number_of_orders))
+            keep = np.ones(number_of_orders)
+            keep[changed] = 0
+            unchanged = scipy.sparse.diags(keep)
+            selection = scipy.sparse.csr_matrix((np.ones(len(changed)), (changed, np.arange(len(changed)))),
+                                                shape=(number_of_orders, len(changed)))
+            # new rows of the changed orders, placed as rows and columns, their common block is counted twice
+            changed_rows = (incidence[changed] * incidence.T).tocsr()
+            placed_rows = selection * changed_rows
+            projection = unchanged * projection * unchanged + placed_rows + placed_rows.T \
+                - selection * changed_rows[:, changed] * selection.T
+            projection = projection.tocsr()
+            projection.eliminate_zeros()
+        self._order_projection = projection
+        self._changed_orders = set()
+        return list(self.orders), projection.copy()
+
+    def degrees(self, orders=True, weighted=False):
+        """
+        Degrees of one mode by the indices of its nodes
+        :param orders: True for the orders, False for the machines
+        :param weighted: count the steps instead of the distinct neighbours
+        """
+        if orders:
+            return self.order_steps if weighted else self.order_degree
+        return self.machine_steps if weighted else self.machine_degree
+
+
+def _check_scipy():
+    if scipy is None:
+        raise ImportError('scipy is needed for the sparse matrices of the bipartite network')
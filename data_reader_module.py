@@ -3,11 +3,14 @@
 Module for automatic transformation of material data into graph representation
 """
 
+import collections
 import csv
 import functools
 import heapq as hp
 import math
 
+import numpy as np
+
 
 @functools.total_ordering
 class Order(object):
@@ -59,16 +62,18 @@ class Order(object):
                 i += 1
         return i
 
-    def get_next_step_index(self, step_index):
+    def get_next_step_index(self, step_index, next_method=None):
         """
         Return index of next step with taking care of different next relationships
+        :param next_method: START_TIME_NEXT or FOLLOWING_NEXT, default is Order.nextMethod
         """
-        if Order.nextMethod == Order.START_TIME_NEXT:
+        next_method = next_method or Order.nextMethod
+        if next_method == Order.START_TIME_NEXT:
             if step_index < len(self.steps) - 1:
                 return step_index + 1
             else:
                 raise IndexError()
-        elif Order.nextMethod == Order.FOLLOWING_NEXT:
+        elif next_method == Order.FOLLOWING_NEXT:
             search_index = step_index + 1
             # Search next Index of a step which starts after actual step
             while search_index < len(self.steps) - 1:
@@ -112,6 +117,7 @@ class Data(object):
         self.keep_raw_data = keep_raw_data
         self.with_plausible_check = with_plausible_check
         self.keep_single_line_orders = keep_single_line_orders
+        self._interval_index = None
 
     def append_data(self, order_id, machine_id, start_time, end_time):
         """Append single Data line"""
@@ -137,6 +143,7 @@ class Data(object):
             self.last_order.append_step(*step_info[1:])
 
         self._number_of_lines += 1
+        self._interval_index = None
 
     # noinspection PyUnusedLocal
     @staticmethod
@@ -148,6 +155,66 @@ class Data(object):
     def get_orders(self):
         return self.orders
 
+    @property
+    def interval_index(self):
+        """
+        Index of the active times of all orders and steps, built once after the data is complete
+        :rtype: IntervalIndex
+        """
+        if self._interval_index is None:
+            self._interval_index = IntervalIndex(self.orders)
+        return self._interval_index
+
+
+class IntervalIndex(object):
+    """
+    Sorted endpoints of the orders [start_time, end_time] and of their steps, like Order.is_order_active and
+    Order.number_of_active_steps but for all orders at once.
+
+    The number of active intervals at time t is the number of starts <= t minus the number of ends < t, which is
+    a binary search for a single time and vectorized for a whole time series. The orders active at t are found
+    among the orders starting between t minus the longest order duration and t.
+    """
+
+    def __init__(self, orders):
+        self.orders = sorted(orders, key=lambda order: order.start_time)
+        self._order_starts = np.array([order.start_time for order in self.orders], dtype=float)
+        self._order_ends = np.array([order.end_time for order in self.orders], dtype=float)
+        self._sorted_order_ends = np.sort(self._order_ends)
+        self._max_duration = (self._order_ends - self._order_starts).max() if self.orders else 0.0
+        steps = np.array([step[1:3] for order in self.orders for step in order.steps], dtype=float).reshape(-1, 2)
+        self._step_starts = np.sort(steps[:, 0])
+        self._step_ends = np.sort(steps[:, 1])
+
+    @staticmethod
+    def _count(starts, ends, times):
+        return np.searchsorted(starts, times, 'right') - np.searchsorted(ends, times, 'left')
+
+    def number_of_active_orders(self, times):
+        """Number of orders with start_time <= t <= end_time for a time or an array of times"""
+        return self._count(self._order_starts, self._sorted_order_ends, times)
+
+    def number_of_active_steps(self, times):
+        """Number of steps of all orders with start <= t <= end for a time or an array of times"""
+        return self._count(self._step_starts, self._step_ends, times)
+
+    def active_orders(self, time):
+        """All orders active at time, ordered by their start time"""
+        first = np.searchsorted(self._order_starts, time - self._max_duration, 'left')
+        last = np.searchsorted(self._order_starts, time, 'right')
+        candidates = np.flatnonzero(self._order_ends[first:last] >= time) + first
+        return [self.orders[index] for index in candidates]
+
+    def work_in_progress(self, start_time, end_time, step=1.0, steps=False):
+        """
+        Return the times from start_time to end_time with the given step and the number of active orders
+        (or steps) at each of them
+        """
+        times = np.arange(start_time, end_time + step / 2.0, step)
+        if steps:
+            return times, self.number_of_active_steps(times)
+        return times, self.number_of_active_orders(times)
+
 
 class OrderIterator(object):
     """ Iterates stepwise over orders """
@@ -226,20 +293,111 @@ class OrderIterator(object):
         return actual_order, step_index
 
 
+# kinds of GraphEvent
+EVENT_NODE_ADDED = 'node added'
+EVENT_EDGE_ADDED = 'edge added'
+EVENT_WEIGHT_CHANGED = 'weight changed'
+EVENT_EDGE_REMOVED = 'edge removed'
+EVENT_GRAPH_CLEARED = 'graph cleared'
+
+# modification of a graph, old_data and new_data are copies of the edge attributes before and after it (None if the
+# edge does not exist), node_v is None for node events and both nodes are None if the graph was cleared
+GraphEvent = collections.namedtuple('GraphEvent', ['kind', 'node_u', 'node_v', 'old_data', 'new_data'])
+
+
+class GraphEventBus(object):
+    """Publish each modification of the graph of a constructor as GraphEvent to the subscribers"""
+
+    def __init__(self):
+        self._subscribers = []
+
+    def subscribe(self, subscriber):
+        """The subscriber has to provide graph_changed(event)"""
+        if subscriber not in self._subscribers:
+            self._subscribers.append(subscriber)
+
+    def unsubscribe(self, subscriber):
+        if subscriber in self._subscribers:
+            self._subscribers.remove(subscriber)
+
+    @property
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def publish(self, kind, node_u=None, node_v=None, old_data=None, new_data=None):
+        event = GraphEvent(kind, node_u, node_v, old_data, new_data)
+        for subscriber in self._subscribers:
+            subscriber.graph_changed(event)
+
+    def edge_changed(self, node_u, node_v, old_data, new_data):
+        """Publish the modification of the edge (u, v) with the matching kind"""
+        if old_data is None:
+            kind = EVENT_EDGE_ADDED
+        elif new_data is None:
+            kind = EVENT_EDGE_REMOVED
+        else:
+            kind = EVENT_WEIGHT_CHANGED
+        self.publish(kind, node_u, node_v, old_data, new_data)
+
+
 class AbstractGraphConstructor(object):
     """ Creates graph out of Data object """
 
-    def __init__(self, data, graph, with_weight=True):
+    def __init__(self, data, graph, with_weight=True, next_method=None, daily_graph=False, step_iterator=None):
+        """
+        :param next_method: Order.START_TIME_NEXT or Order.FOLLOWING_NEXT, default is Order.nextMethod
+        :param daily_graph: True to keep only the edges of the actual day, the graph is cleared by the first edge of
+            each new day
+        :param step_iterator: source of the steps, default is a new OrderIterator, see FanOutReplay
+        """
         self.data = data
-        self.step_iterator = OrderIterator(data.get_orders())
+        self.step_iterator = step_iterator if step_iterator is not None else OrderIterator(data.get_orders())
         self.graph = graph
         self._with_weight = with_weight
+        self.next_method = next_method
+        self.daily_graph = daily_graph
+        self._day = None
+        # time and edge read ahead by next_edge_time
+        self._next_edge = None
         self._saved_data = None
+        # modifications of the graph, see GraphEventBus
+        self.event_bus = GraphEventBus()
+        self._step_listeners = []
+        # counter of all modifications of the graph and of the ones which add or remove nodes or edges
+        self.graph_version = 0
+        self.topology_version = 0
 
     def _add_edge(self, node_text_u, node_text_v):
         """Add Edge to graph"""
         pass
 
+    def add_step_listener(self, listener):
+        """
+        Register a listener which is informed about every step read, also the ones without projected edge.
+        The listener has to provide step_read(order, step_index).
+        """
+        if listener not in self._step_listeners:
+            self._step_listeners.append(listener)
+
+    def remove_step_listener(self, listener):
+        if listener in self._step_listeners:
+            self._step_listeners.remove(listener)
+
+    def _notify_step_read(self, order, step_index):
+        for listener in self._step_listeners:
+            listener.step_read(order, step_index)
+
+    def _graph_modified(self, topology_changed):
+        self.graph_version += 1
+        if topology_changed:
+            self.topology_version += 1
+
+    def _clear_graph(self):
+        self.graph.clear()
+        self._graph_modified(True)
+        if self.event_bus.has_subscribers:
+            self.event_bus.publish(EVENT_GRAPH_CLEARED)
+
     def get_graph_stepwise(self):
         """ Create graph step by step """
         #       determine next step
@@ -247,6 +405,8 @@ class AbstractGraphConstructor(object):
             actual_order, step_index = self.step_iterator.next()
         except StopIteration:
             raise StopIteration()
+        if self._step_listeners:
+            self._notify_step_read(actual_order, step_index)
 
         node_order_text = 'O' + str(actual_order.order_id)
         node_machine_text = 'M' + str(actual_order.steps[step_index][0])
@@ -255,25 +415,46 @@ class AbstractGraphConstructor(object):
 
     def get_graph_stepwise_projected(self, add_edge=True):
         """ Project on machines. Returns time of added edge """
-        # read next steps until one has a follower (next step inside his order)
+        if self._next_edge is not None:
+            time, edge = self._next_edge
+            self._next_edge = None
+        else:
+            time, edge = self._read_projected_edge()
+        if add_edge:
+            if self.daily_graph:
+                self._start_day(time)
+            self._add_edge(*edge)
+            return time
+        # else
+        return time, edge
+
+    def next_edge_time(self):
+        """Time of the edge added by the next call of get_graph_stepwise_projected, inf at the end of the data"""
+        if self._next_edge is None:
+            try:
+                self._next_edge = self._read_projected_edge()
+            except StopIteration:
+                return float('inf')
+        return self._next_edge[0]
+
+    def _read_projected_edge(self):
+        """Read the next steps until one has a follower (next step inside his order) and return time and edge"""
         while True:
             try:
                 actual_order, step_index = self.step_iterator.next()
             except StopIteration:
                 raise StopIteration()
+            if self._step_listeners:
+                self._notify_step_read(actual_order, step_index)
 
             try:
-                next_step_index = actual_order.get_next_step_index(step_index)
+                next_step_index = actual_order.get_next_step_index(step_index, self.next_method)
                 break
             except IndexError:
                 pass
 
         first_machine = 'M' + str(actual_order.steps[next_step_index][0])
         second_machine = 'M' + str(actual_order.steps[step_index][0])
-        if add_edge:
-            self._add_edge(first_machine, second_machine)
-            return actual_order.steps[step_index][1]
-        # else
         return actual_order.steps[step_index][1], (first_machine, second_machine)
 
     def get_full_graph(self):
@@ -292,9 +473,16 @@ class AbstractGraphConstructor(object):
             except StopIteration:
                 break
 
+    def _start_day(self, time):
+        """Clear the graph if time is on a later day than the previous edge"""
+        day = math.floor(time)
+        if self._day is not None and day > self._day:
+            self._clear_graph()
+        self._day = day
+
     def get_daily_graph(self, clear_graph=False, number_of_days=1):
         if clear_graph:
-            self.graph.clear()
+            self._clear_graph()
 
         # read first line and get time
         if self._saved_data is None:
@@ -315,12 +503,23 @@ class AbstractGraphConstructor(object):
 class NxGraphConstructor(AbstractGraphConstructor):
     """ Constructor for Graph from NetworkX Package"""
 
-    def __init__(self, data, graph, with_weight=True):
-        super(NxGraphConstructor, self).__init__(data, graph, with_weight)
+    def __init__(self, data, graph, with_weight=True, next_method=None, daily_graph=False, step_iterator=None):
+        super(NxGraphConstructor, self).__init__(data, graph, with_weight, next_method, daily_graph, step_iterator)
 
     def _add_edge(self, node_text_u, node_text_v):
+        has_edge = self.graph.has_edge(node_text_u, node_text_v)
+        # copy of the old attributes only needed for the events
+        publish = self.event_bus.has_subscribers
+        old_data = None
+        if publish:
+            if has_edge:
+                old_data = dict(self.graph[node_text_u][node_text_v])
+            for node in (node_text_u, node_text_v):
+                if node not in self.graph:
+                    self.event_bus.publish(EVENT_NODE_ADDED, node)
+
         if self._with_weight:
-            if self.graph.has_edge(node_text_u, node_text_v):
+            if has_edge:
                 self.graph[node_text_u][node_text_v]['weight'] += 1
                 self.graph[node_text_u][node_text_v]['inverted w'] = 1.0 / self.graph[node_text_u][node_text_v][
                     'weight']
@@ -329,28 +528,61 @@ class NxGraphConstructor(AbstractGraphConstructor):
                 self.graph[node_text_u][node_text_v]['inverted w'] = 1
         else:
             self.graph.add_edge(node_text_u, node_text_v)
+        if self._with_weight or not has_edge:
+            self._graph_modified(not has_edge)
+
+        if publish:
+            self.event_bus.edge_changed(node_text_u, node_text_v, old_data,
+                                        dict(self.graph[node_text_u][node_text_v]))
+
+    def remove_edge(self, node_text_u, node_text_v):
+        """Remove the edge (u, v) from the graph, e.g. for sliding windows"""
+        old_data = dict(self.graph[node_text_u][node_text_v]) if self.event_bus.has_subscribers else None
+        self.graph.remove_edge(node_text_u, node_text_v)
+        self._graph_modified(True)
+        if old_data is not None:
+            self.event_bus.edge_changed(node_text_u, node_text_v, old_data, None)
 
 
 class GtGraphConstructor(AbstractGraphConstructor):
     """ Constructor for Graph from NetworkX Package"""
 
-    def __init__(self, data, graph, with_weight=True):
-        super(GtGraphConstructor, self).__init__(data, graph, with_weight)
+    def __init__(self, data, graph, with_weight=True, next_method=None, daily_graph=False, step_iterator=None):
+        super(GtGraphConstructor, self).__init__(data, graph, with_weight, next_method, daily_graph, step_iterator)
         self._nodes = {}
         if with_weight:
             self._weights = graph.new_edge_property("double")
 
+    def _clear_graph(self):
+        super(GtGraphConstructor, self)._clear_graph()
+        self._nodes = {}
+
     def _add_edge(self, node_text_u, node_text_v):
+        if self.event_bus.has_subscribers:
+            for node in (node_text_u, node_text_v):
+                if node not in self._nodes:
+                    self.event_bus.publish(EVENT_NODE_ADDED, node)
         node_key_u = self._get_node_key(node_text_u)
         node_key_v = self._get_node_key(node_text_v)
 
         edge = self.graph.edge(node_key_u, node_key_v)
+        old_data = None
         if edge is None:
             edge = self.graph.add_edge(node_key_u, node_key_v)
             if self._with_weight:
                 self._weights[edge] = 0
+        elif self._with_weight:
+            old_data = {'weight': self._weights[edge]}
+        else:
+            old_data = {}
         if self._with_weight:
             self._weights[edge] += 1
+        if self._with_weight or old_data is None:
+            self._graph_modified(old_data is None)
+
+        if self.event_bus.has_subscribers:
+            new_data = {'weight': self._weights[edge]} if self._with_weight else {}
+            self.event_bus.edge_changed(node_text_u, node_text_v, old_data, new_data)
 
     def _get_node_key(self, node_text):
         """ Return node_key from given node text """
@@ -0,0 +1,121 @@
+"""
+Replay of one event stream into several graph variants at once.
+
+The orders are read and iterated only once, every graph constructor reads the shared steps with its own cursor:
+replay = FanOutReplay(data)
+following = replay.add_model(nx.DiGraph(), next_method=data_reader_module.Order.FOLLOWING_NEXT)
+per_day = replay.add_model(nx.DiGraph(), daily_graph=True)
+replay.run()
+"""
+
+import collections
+
+import data_reader_module
+import network_analysis as neta
+
+
+class ReplayCursor(object):
+    """Step iterator of a single graph constructor over the steps of a FanOutReplay"""
+
+    def __init__(self, replay):
+        """
+        :type replay: FanOutReplay
+        """
+        self.replay = replay
+        self.position = 0
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        step = self.replay.step(self.position)
+        self.position += 1
+        self.replay.release()
+        return step
+
+
+class FanOutReplay(object):
+    """
+    Single pass over the OrderIterator of the data which feeds several graph constructors and their models.
+
+    The steps are buffered until every cursor has read them. The models advance in lockstep by their actual time, the
+    model furthest behind is updated first, so with different update types the buffer only holds the steps of about
+    one update of the coarsest model.
+    """
+
+    def __init__(self, data):
+        """
+        :type data: data_reader_module.Data
+        """
+        self.data = data
+        self._step_iterator = data_reader_module.OrderIterator(data.get_orders())
+        self._buffer = collections.deque()
+        # position of the first buffered step
+        self._offset = 0
+        self._cursors = []
+        self.models = []
+        # models which reached the end of the data
+        self._finished = set()
+
+    def cursor(self):
+        """New step iterator starting at the first step, which has to be used before other cursors advanced"""
+        if self._offset:
+            raise ValueError('the replay already started')
+        cursor = ReplayCursor(self)
+        self._cursors.append(cursor)
+        return cursor
+
+    def step(self, position):
+        """Return the step (order, step index) at the position of the stream, StopIteration at its end"""
+        while position >= self._offset + len(self._buffer):
+            self._buffer.append(self._step_iterator.next())
+        return self._buffer[position - self._offset]
+
+    def release(self):
+        """Drop the steps read by all cursors"""
+        first_needed = min(cursor.position for cursor in self._cursors)
+        while self._offset < first_needed and self._buffer:
+            self._buffer.popleft()
+            self._offset += 1
+
+    def add_constructor(self, graph, constructor_class=data_reader_module.NxGraphConstructor, **parameters):
+        """
+        Return a graph constructor reading from this replay
+        :param parameters: further parameters of the constructor, e.g. with_weight, next_method or daily_graph
+        """
+        return constructor_class(self.data, graph, step_iterator=self.cursor(), **parameters)
+
+    def add_model(self, graph, update_type=neta.Model.UPDATE_DAILY, property_types=None,
+                  constructor_class=data_reader_module.NxGraphConstructor, **parameters):
+        """
+        Return a model of a new graph variant reading from this replay, updated by run
+        :param property_types: properties added to the model
+        """
+        constructor = self.add_constructor(graph, constructor_class, **parameters)
+        model = neta.Model(graph, constructor, update_type, property_types)
+        self.models.append(model)
+        return model
+
+    def update(self, until=None):
+        """
+        Update the models with the earliest actual time which have neither reached the end of the data nor the
+        time until
+        :return: False if no model was updated
+        """
+        running_models = [model for model in self.models
+                          if model not in self._finished and (until is None or model.actual_time < until)]
+        if not running_models:
+            return False
+        earliest_time = min(model.actual_time for model in running_models)
+        for model in running_models:
+            if model.actual_time == earliest_time:
+                try:
+                    model.update()
+                except StopIteration:
+                    self._finished.add(model)
+        return True
+
+    def run(self, until=None):
+        """Update all models until the end of the data or until all of them reached the time until"""
+        while self.update(until):
+            pass
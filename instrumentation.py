@@ -0,0 +1,190 @@
+"""Instrumentation of a model: timings of the properties, event rate, graph size and memory"""
+
+import collections
+import json
+import sys
+import types
+
+import numpy as np
+
+# subsystems of the memory accounting: the orders read, the graph with its constructor and the property data
+SUBSYSTEM_READER = 'reader'
+SUBSYSTEM_CONSTRUCTOR = 'constructor'
+SUBSYSTEM_PROPERTY_HISTORIES = 'property histories'
+# objects which are not followed, the code and the bound methods of listeners would lead to the whole model
+_SKIPPED_TYPES = (type, types.ClassType, types.ModuleType, types.FunctionType, types.MethodType,
+                  types.BuiltinFunctionType)
+
+
+class PropertyStats(object):
+    """Number of evaluations and their wall time of a single property"""
+
+    def __init__(self):
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.last_seconds = 0.0
+
+    def record(self, seconds):
+        self.calls += 1
+        self.total_seconds += seconds
+        self.last_seconds = seconds
+
+    @property
+    def mean_seconds(self):
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+    def as_dict(self):
+        return {'calls': self.calls, 'total seconds': self.total_seconds, 'last seconds': self.last_seconds,
+                'mean seconds': self.mean_seconds}
+
+
+class ModelStats(object):
+    """
+    Statistics of a model, available as model.stats.
+    Memory per subsystem is only measured after enable_memory_tracing: the bytes held by the objects reachable from
+    the data read, from the graph and its constructor and from the data of the properties, each object counted once.
+    Memory outside of Python objects, e.g. of graph-tool graphs, is not seen.
+    With a dump_path the statistics are appended as json line to the file every dump_interval updates.
+    """
+
+    def __init__(self, dump_path=None, dump_interval=10):
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self.properties = {}
+        self.number_of_updates = 0
+        self.number_of_nodes = 0
+        self.number_of_edges = 0
+        self.actual_time = 0
+        self.total_events = 0
+        self.event_seconds = 0.0
+        # events and seconds of the graph modification of the latest update
+        self._update_events = 0
+        self._update_event_seconds = 0.0
+        self.last_events_per_second = 0.0
+        self.memory = {}
+        self.memory_tracing = False
+
+    def record_property(self, property_type, seconds):
+        if property_type not in self.properties:
+            self.properties[property_type] = PropertyStats()
+        self.properties[property_type].record(seconds)
+
+    def forget_property(self, property_type):
+        self.properties.pop(property_type, None)
+
+    def record_event(self, seconds):
+        """Bookkeeping of a single event read by the graph constructor"""
+        self.total_events += 1
+        self.event_seconds += seconds
+        self._update_events += 1
+        self._update_event_seconds += seconds
+
+    @property
+    def events_per_second(self):
+        return self.total_events / self.event_seconds if self.event_seconds else 0.0
+
+    def update_finished(self, model):
+        """Bookkeeping at the end of each model update
+        :type model: network_analysis.Model
+        """
+        self.number_of_updates += 1
+        self.number_of_nodes = model.graph.number_of_nodes()
+        self.number_of_edges = model.graph.number_of_edges()
+        self.actual_time = model.actual_time
+        if self._update_event_seconds:
+            self.last_events_per_second = self._update_events / self._update_event_seconds
+        self._update_events = 0
+        self._update_event_seconds = 0.0
+
+        if self.dump_path and self.number_of_updates % self.dump_interval == 0:
+            self.dump(model)
+
+    def enable_memory_tracing(self):
+        """Measure the memory per subsystem at every dump, which walks all objects of the subsystems"""
+        self.memory_tracing = True
+
+    def measure_memory(self, model):
+        """Return and store the memory in bytes held by each subsystem of the model, empty without tracing
+        :type model: network_analysis.Model
+        """
+        if not self.memory_tracing:
+            return {}
+        constructor = model.graph_constructor
+        network_properties = model.network_properties.values()
+        # the listeners of the constructor are counted with their subsystem
+        seen = dict((id(listener), listener) for listener in [model] + network_properties)
+        self.memory = {
+            SUBSYSTEM_READER: _deep_size(constructor.data, seen),
+            SUBSYSTEM_CONSTRUCTOR: _deep_size([constructor, model.graph], seen),
+            SUBSYSTEM_PROPERTY_HISTORIES: _deep_size([network_property.data for network_property in network_properties],
+                                                    seen),
+        }
+        return self.memory
+
+    def as_dict(self):
+        return {
+            'updates': self.number_of_updates,
+            'actual time': self.actual_time,
+            'nodes': self.number_of_nodes,
+            'edges': self.number_of_edges,
+            'total events': self.total_events,
+            'events per second': self.events_per_second,
+            'last events per second': self.last_events_per_second,
+            'properties': dict((property_type, stats.as_dict())
+                               for property_type, stats in self.properties.iteritems()),
+            'memory': self.memory,
+        }
+
+    def dump(self, model=None):
+        """Append the statistics as json line to the dump file, with the memory of the model if given"""
+        if model is not None:
+            self.measure_memory(model)
+        with open(self.dump_path, 'a') as dump_file:
+            dump_file.write(json.dumps(self.as_dict(), sort_keys=True) + '\n')
+
+    def summary(self):
+        """Short summary, e.g. for a status line"""
+        text = '{0:.0f} events/s  {1} nodes  {2} edges'.format(self.last_events_per_second, self.number_of_nodes,
+                                                                   self.number_of_edges)
+        if self.properties:
+            property_type, stats = max(self.properties.iteritems(), key=lambda item: item[1].last_seconds)
+            text += '\nslowest: {0} {1:.1f} ms'.format(property_type, 1000 * stats.last_seconds)
+        if self.memory:
+            text += '\n' + '  '.join('{0} {1:.1f} MB'.format(name, size / 1e6)
+                                     for name, size in sorted(self.memory.iteritems()))
+        return text
+
+
+def _deep_size(root, seen=None):
+    """
+    Return the bytes of root and all objects reachable from it which are not in seen, the counted objects are added
+    to seen by their id. They are kept in seen, so the ids of temporary objects are not reused while walking.
+    Numpy arrays are counted with the buffer they own.
+    """
+    if seen is None:
+        seen = {}
+    size = 0
+    pending = [root]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, _SKIPPED_TYPES):
+            continue
+        seen[id(obj)] = obj
+        size += sys.getsizeof(obj)
+        if isinstance(obj, np.ndarray):
+            if obj.base is not None:
+                pending.append(obj.base)
+            if obj.dtype == object:
+                pending.extend(obj.ravel())
+            continue
+        if isinstance(obj, dict):
+            pending.extend(obj.iterkeys())
+            pending.extend(obj.itervalues())
+        elif isinstance(obj, (list, tuple, set, frozenset, collections.deque)):
+            pending.extend(obj)
+        if hasattr(obj, '__dict__'):
+            pending.append(obj.__dict__)
+        for slot in getattr(type(obj), '__slots__', ()):
+            if hasattr(obj, slot):
+                pending.append(getattr(obj, slot))
+    return size
@@ -53,6 +53,41 @@ class Main(object):
             self.model.update_type = neta.Model.UPDATE_DAILY
             # self.model.update_type = neta.Model.UPDATE_WEEKLY
 
+            # ---- Maximal seconds per update for the properties to keep the GUI responsive,
+            #      expensive properties are calculated later if they do not fit (None = no limit),
+            #      not together with a result sink
+            # self.model.time_budget = .5
+
+            # ---- Evaluate independent properties in parallel worker processes
+            # import parallel_evaluation
+            # self.model.parallel_evaluator = parallel_evaluation.ParallelEvaluator(self.model)
+
+            # ---- Write one row per update into a file instead of printing the data on output
+            # import result_writer
+            # self.model.result_sink = result_writer.create_result_sink('results.npz')
+
+            # ---- Statistics of the model (timings per property, events/s, graph size, memory per subsystem),
+            #      appended to a file every 10 updates, memory tracing walks all objects of the model
+            # self.model.stats.dump_path = 'stats.jsonl'
+            # self.model.stats.enable_memory_tracing()
+
+            # ---- Animation without display: record a snapshot after each update and render them offscreen
+            #      to PNG frames or a video (needs ffmpeg) in parallel processes
+            # import offscreen_rendering
+            # recorder = offscreen_rendering.FrameRecorder(self.controller, 'snapshots')
+            # offscreen_rendering.record_updates(recorder, number_of_updates=365)
+            # recorder.render_video('network.mp4')
+
+            # ---- Cadence of single properties, e.g. calculate only when plotted or every 7 days
+            # self.controller.add_property('Assortativity', neta.Model.TYPE_DEGREE_ASSORTATIVITY,
+            #                              cadence=neta.Model.CADENCE_ON_OBSERVE)
+            # self.controller.add_property('Density', neta.Model.TYPE_DENSITY, cadence=7)
+
+            # ---- Additional daily and weekly points of a property in the same replay (needs a finer update type),
+            #      available as self.model.resolution_series(neta.Model.TYPE_DENSITY, neta.Model.UPDATE_WEEKLY)
+            # self.model.add_resolution(neta.Model.TYPE_DENSITY, neta.Model.UPDATE_DAILY)
+            # self.model.add_resolution(neta.Model.TYPE_DENSITY, neta.Model.UPDATE_WEEKLY)
+
             # ---- Standard Properties
             # self.controller.add_property('Events/Time', neta.Model.TYPE_EVENT_COUNTER,
             #                              domain_type=neta.Controller.DOMAIN_REAL_TIME,
@@ -60,6 +95,7 @@ class Main(object):
             self.controller.add_property('#Events', neta.Model.TYPE_REAL_TIME)
             # self.controller.add_property('#Edges', neta.Model.TYPE_EDGE_COUNT)
             # self.controller.add_property('#Nodes', neta.Model.TYPE_NODE_COUNT)
+            # self.controller.add_property('WIP', neta.Model.TYPE_WORK_IN_PROGRESS)
 
             # ---- Connections
             # self.controller.add_property('#Components', neta.Model.TYPE_CONNECTED_COMPONENTS)
@@ -70,6 +106,8 @@ class Main(object):
             # self.controller.add_property('Density', neta.Model.TYPE_DENSITY)
             # self.controller.add_property('Assortativity', neta.Model.TYPE_DEGREE_ASSORTATIVITY)
             # self.controller.add_property('Efficiency', neta.Model.TYPE_EFFICIENCY)
+            # self.controller.add_property('Algebraic Connectivity', neta.Model.TYPE_ALGEBRAIC_CONNECTIVITY)
+            # self.controller.add_property('Spectral Radius', neta.Model.TYPE_SPECTRAL_RADIUS)
             # self.controller.add_property('Weighted Efficiency', neta.Model.TYPE_WEIGHTED_EFFICIENCY)
             # self.controller.add_property('Avg. Local Efficiency', neta.Model.TYPE_AVG_LOCAL_EFFICIENCY)
             # self.controller.add_property('Avg. Weighted Local Efficiency',
@@ -88,12 +126,20 @@ class Main(object):
             # self.controller.add_property('Weighted In-Out-Degree',
             #                              neta.Model.TYPE_WEIGHTED_IN_OUT_DEGREE_DISTRIBUTION)
 
+            # ---- Two-mode order-machine network, projections via self.model.bipartite_incidence() (needs scipy)
+            # self.controller.add_property('Order Degree', neta.Model.TYPE_ORDER_DEGREE_DISTRIBUTION)
+            # self.controller.add_property('Machine Degree', neta.Model.TYPE_MACHINE_DEGREE_DISTRIBUTION)
+            # self.controller.add_property('Order Steps', neta.Model.TYPE_WEIGHTED_ORDER_DEGREE_DISTRIBUTION)
+            # self.controller.add_property('Machine Steps', neta.Model.TYPE_WEIGHTED_MACHINE_DEGREE_DISTRIBUTION)
+
             # ---- Vertex Properties
             # - only one at a time possible
             # self.controller.add_property('Degree Centrality', neta.Model.TYPE_DEGREE_CENTRALITY)
             # self.controller.add_property('Closeness Centrality', neta.Model.TYPE_CLOSENESS_CENTRALITY)
             # self.controller.add_property('Betweenness centrality', neta.Model.TYPE_BETWEENNESS_CENTRALITY)
             # self.controller.add_property('Local Efficiency', neta.Model.TYPE_LOCAL_EFFICIENCY)
+            # self.controller.add_property('PageRank', neta.Model.TYPE_PAGERANK)
+            # self.controller.add_property('Katz Centrality', neta.Model.TYPE_KATZ_CENTRALITY)
 
             # ---- Weighted Vertex Properties
             # self.controller.add_property('Weighted Local Efficiency', neta.Model.TYPE_WEIGHTED_LOCAL_EFFICIENCY)
@@ -101,6 +147,7 @@ class Main(object):
             #                               neta.Model.TYPE_WEIGHTED_BETWEENNESS_CENTRALITY)
             # self.controller.add_property('Weighted Closeness Centrality',
             #                              neta.Model.TYPE_WEIGHTED_CLOSENESS_CENTRALITY)
+            # self.controller.add_property('Weighted PageRank', neta.Model.TYPE_WEIGHTED_PAGERANK)
 
             # --------- only for connected graphs
             # self.controller.add_property('Diameter', neta.Model.TYPE_DIAMETER)
@@ -125,9 +172,13 @@ class Main(object):
         # while actual_time <= 7.5:
         #     actual_time = self.model.update(only_graph_modification=False)
 
-    def observe(self):
+    def observe(self, snapshot=None):
         """Observe the model and update the GUI"""
-        self.controller.plot()
+        self.controller.plot(snapshot)
+
+    def capture(self):
+        """Snapshot of the model, drawn by observe while the model continues in the background"""
+        return self.controller.capture()
 
     def update(self):
         """Keep everything moving"""
@@ -136,12 +187,23 @@ class Main(object):
     def output_data(self):
         self.controller.output_data()
 
+    def status(self):
+        """Summary of the model statistics for the status line"""
+        return self.model.stats.summary()
+
 
 import pycxsimulator
 
 starter = Main()
-pycxsimulator.GUI(
+simulator = pycxsimulator.GUI(
     title='Control View',
     parameterSetters=starter.parameter_setters,
-    outputFunction=starter.output_data
-).start(func=[starter.initialize, starter.observe, starter.update])
+    outputFunction=starter.output_data,
+    statusFunction=starter.status,
+    # run the model in a background thread and draw its snapshots instead of stepping and drawing alternately
+    # snapshotFunction=starter.capture
+)
+simulator.start(func=[starter.initialize, starter.observe, starter.update])
+# after the window is closed, a background step may still be running
+with simulator.modelLock:
+    starter.model.close()
@@ -1,13 +1,32 @@
 """Analysis tool for iterative network analysis """
 
 import collections
+import copy
 import math
-from operator import itemgetter
+import timeit
 
 import networkx as nx
+import numpy as np
 import pylab as pl
 
 import data_reader_module
+from bipartite import BipartiteIncidence
+from instrumentation import ModelStats
+from time_series import GrowableArray, MinMaxDownsampler, NodeTimeMatrix, TimeSeries
+
+try:
+    import scipy.sparse
+    import scipy.sparse.linalg
+except ImportError:
+    scipy = None
+
+# Marker for points of a time series which were not calculated
+MISSING_VALUE = float('nan')
+
+
+def is_missing(value):
+    """Check if value is the marker of a not calculated point"""
+    return value != value
 
 
 class Model(object):
@@ -22,6 +41,8 @@ class Model(object):
     TYPE_AVG_CLUSTERING_COEFFICIENT = 'average clustering coefficient'
     TYPE_DENSITY = 'density'
     TYPE_DEGREE_ASSORTATIVITY = 'degree assortativity'
+    # number of active orders at the actual time
+    TYPE_WORK_IN_PROGRESS = 'work in progress'
 
     TYPE_DIAMETER_ADAPTION = 'diameter adaption'
     TYPE_AVG_SHORTEST_PATH_ADAPTION = 'average shortest path adaption'
@@ -32,6 +53,10 @@ class Model(object):
     TYPE_WEIGHTED_PROPORTION_OF_BIGGEST_COMPONENT = 'weighted biggest component'
 
     TYPE_EFFICIENCY = 'efficiency'
+    # robustness indicators by sparse eigensolvers, need scipy
+    TYPE_ALGEBRAIC_CONNECTIVITY = 'algebraic connectivity'
+    TYPE_WEIGHTED_ALGEBRAIC_CONNECTIVITY = 'weighted algebraic connectivity'
+    TYPE_SPECTRAL_RADIUS = 'spectral radius'
     TYPE_AVG_LOCAL_EFFICIENCY = 'average local efficiency'
     TYPE_WEIGHTED_EFFICIENCY = 'weighted efficiency'
     TYPE_WEIGHTED_AVG_LOCAL_EFFICIENCY = 'weighted average local efficiency'
@@ -46,16 +71,26 @@ class Model(object):
     TYPE_WEIGHTED_OUT_DEGREE_DISTRIBUTION = 'weighted out-degree distribution'
     TYPE_WEIGHTED_IN_OUT_DEGREE_DISTRIBUTION = 'weighted in-out-degree distribution'
 
+    # degrees in the two-mode order-machine network, weighted by the number of steps
+    TYPE_ORDER_DEGREE_DISTRIBUTION = 'order degree distribution'
+    TYPE_MACHINE_DEGREE_DISTRIBUTION = 'machine degree distribution'
+    TYPE_WEIGHTED_ORDER_DEGREE_DISTRIBUTION = 'weighted order degree distribution'
+    TYPE_WEIGHTED_MACHINE_DEGREE_DISTRIBUTION = 'weighted machine degree distribution'
+
     TYPE_CLUSTERING_COEFFICIENT = 'clustering coefficient'
     TYPE_DEGREE_CENTRALITY = 'degree centrality'
     TYPE_CLOSENESS_CENTRALITY = 'closeness centrality'
     TYPE_BETWEENNESS_CENTRALITY = 'betweenness centrality'
     TYPE_LOCAL_EFFICIENCY = 'local efficiency'
+    # maintained by local residual pushes
+    TYPE_PAGERANK = 'pagerank'
+    TYPE_KATZ_CENTRALITY = 'katz centrality'
 
     TYPE_WEIGHTED_CLUSTERING_COEFFICIENT = 'weighted clustering coefficient'
     TYPE_WEIGHTED_BETWEENNESS_CENTRALITY = 'weighted betweenness centrality'
     TYPE_WEIGHTED_CLOSENESS_CENTRALITY = 'weighted closeness centrality'
     TYPE_WEIGHTED_LOCAL_EFFICIENCY = 'weighted local efficiency'
+    TYPE_WEIGHTED_PAGERANK = 'weighted pagerank'
 
     ATTRIBUTE_INVERTED_WEIGHT = 'inverted w'
     ATTRIBUTE_WEIGHT = 'weight'
@@ -64,6 +99,10 @@ class Model(object):
     UPDATE_DAILY = 'daily'
     UPDATE_WEEKLY = 'weekly'
 
+    # cadences of the property evaluation, in addition a number n means at most every n days
+    CADENCE_EVERY_UPDATE = 'every update'
+    CADENCE_ON_OBSERVE = 'on observe'
+
     def __init__(self, graph, graph_constructor, update_type='event', starting_properties=None):
         """
         Model including all network characteristics, graph, ...
@@ -73,6 +112,22 @@ class Model(object):
         :type graph_constructor: data_reader_module.AbstractGraphConstructor
         """
         self._network_properties = {}
+        # maximal time in seconds for evaluating the properties per update, None means unlimited,
+        # cannot be combined with a result sink, which would keep the deferred points as nan
+        self.time_budget = None
+        self.scheduler = PropertyScheduler(self)
+        # optional evaluator of the properties in other processes, see parallel_evaluation.ParallelEvaluator
+        self.parallel_evaluator = None
+        # optional output of one row per update, see result_writer.ResultSink
+        self.result_sink = None
+        # timings, event rate, graph size and memory
+        self.stats = ModelStats()
+        # additional sampling resolutions of each property type by their update type, see add_resolution
+        self._resolutions = {}
+        # two-mode order-machine network, created on demand by bipartite_incidence
+        self._bipartite = None
+        # graph version and result of the last calculation of each memo key, see NetworkProperty.memo_key
+        self._memo = {}
 
         self.real_time = self.add_property(self.TYPE_REAL_TIME)
         self.event_counter = self.add_property(self.TYPE_EVENT_COUNTER)
@@ -103,6 +158,8 @@ class Model(object):
                 network_property = NetworkProperty(nx.number_weakly_connected_components, [self.graph])
             else:
                 network_property = NetworkProperty(nx.number_connected_components, [self.graph])
+        elif property_type == self.TYPE_WORK_IN_PROGRESS:
+            network_property = WorkInProgress(self)
         elif property_type == self.TYPE_DIAMETER:
             network_property = NetworkProperty(nx.diameter, [self.graph])
         elif property_type == self.TYPE_AVG_SHORTEST_PATH:
@@ -120,6 +177,8 @@ class Model(object):
             network_property = DegreeAssortativity(self.graph)
         elif property_type == self.TYPE_EFFICIENCY:
             network_property = Efficiency(self.graph)
+        elif property_type == self.TYPE_ALGEBRAIC_CONNECTIVITY:
+            network_property = AlgebraicConnectivity(self.graph)
         # ----- Weighted Single Valued Characteristics
         elif property_type == self.TYPE_WEIGHTED_PROPORTION_OF_BIGGEST_COMPONENT:
             network_property = ProportionOfBiggestComponent(self.graph, self.ATTRIBUTE_WEIGHT)
@@ -129,6 +188,10 @@ class Model(object):
             network_property = DiameterAdaption(self.graph, self.ATTRIBUTE_INVERTED_WEIGHT)
         elif property_type == self.TYPE_WEIGHTED_EFFICIENCY:
             network_property = Efficiency(self.graph, weight_attribute=self.ATTRIBUTE_INVERTED_WEIGHT)
+        elif property_type == self.TYPE_WEIGHTED_ALGEBRAIC_CONNECTIVITY:
+            network_property = AlgebraicConnectivity(self.graph, self.ATTRIBUTE_WEIGHT)
+        elif property_type == self.TYPE_SPECTRAL_RADIUS:
+            network_property = SpectralRadius(self.graph, self.ATTRIBUTE_WEIGHT)
         # -- handling in controller
         # elif property_type == self.TYPE_AVG_CLUSTERING_COEFFICIENT
         # elif property_type == self.TYPE_AVG_LOCAL_EFFICIENCY
@@ -152,6 +215,15 @@ class Model(object):
             network_property = OutDegreeDistribution(self.graph, weight_attribute=self.ATTRIBUTE_WEIGHT)
         elif property_type == self.TYPE_WEIGHTED_IN_OUT_DEGREE_DISTRIBUTION:
             network_property = InOutDifferenceDegreeDistribution(self.graph, weight_attribute=self.ATTRIBUTE_WEIGHT)
+        # ----- Bipartite Distributions
+        elif property_type == self.TYPE_ORDER_DEGREE_DISTRIBUTION:
+            network_property = BipartiteDegreeDistribution(self.graph, self.bipartite_incidence(), True)
+        elif property_type == self.TYPE_MACHINE_DEGREE_DISTRIBUTION:
+            network_property = BipartiteDegreeDistribution(self.graph, self.bipartite_incidence(), False)
+        elif property_type == self.TYPE_WEIGHTED_ORDER_DEGREE_DISTRIBUTION:
+            network_property = BipartiteDegreeDistribution(self.graph, self.bipartite_incidence(), True, True)
+        elif property_type == self.TYPE_WEIGHTED_MACHINE_DEGREE_DISTRIBUTION:
+            network_property = BipartiteDegreeDistribution(self.graph, self.bipartite_incidence(), False, True)
         # ----- Vertex properties
         elif property_type == self.TYPE_CLUSTERING_COEFFICIENT:
             network_property = ClusteringCoefficient(self.graph)
@@ -171,43 +243,196 @@ class Model(object):
             network_property = LocalEfficiency(self.graph)
         elif property_type == self.TYPE_WEIGHTED_LOCAL_EFFICIENCY:
             network_property = LocalEfficiency(self.graph, weight_attribute=self.ATTRIBUTE_INVERTED_WEIGHT)
+        elif property_type == self.TYPE_PAGERANK:
+            network_property = PageRank(self.graph)
+        elif property_type == self.TYPE_WEIGHTED_PAGERANK:
+            network_property = PageRank(self.graph, weight_attribute=self.ATTRIBUTE_WEIGHT)
+        elif property_type == self.TYPE_KATZ_CENTRALITY:
+            network_property = KatzCentrality(self.graph)
         else:
             raise ValueError
 
+        network_property.property_type = property_type
+        if isinstance(network_property, VertexNetworkProperty):
+            network_property.time_supplier = self
         self._network_properties[property_type] = network_property
+        self._attach_property(network_property)
         return network_property
 
+    def bipartite_incidence(self):
+        """
+        Return the two-mode order-machine network of all steps read since its first request
+        :rtype: BipartiteIncidence
+        """
+        if self._bipartite is None:
+            self._bipartite = BipartiteIncidence()
+            self.graph_constructor.add_step_listener(self._bipartite)
+        return self._bipartite
+
+    def _attach_property(self, network_property):
+        """Inform incrementally maintained properties about every modification of the graph"""
+        if hasattr(network_property, 'graph_changed'):
+            self.graph_constructor.event_bus.subscribe(network_property)
+
+    def _detach_property(self, network_property):
+        if hasattr(network_property, 'graph_changed'):
+            self.graph_constructor.event_bus.unsubscribe(network_property)
+
     def update(self, only_graph_modification=False):
+        if self.time_budget is not None and self.result_sink is not None:
+            raise ValueError('deferred points of a time budget would be written as nan to the result sink')
         if self.update_type == self.UPDATE_EVENT_BASED:
             self._update_graph()
         elif self.update_type == self.UPDATE_DAILY:
-            next_day = math.floor(self.actual_time) + 1
-            while self.actual_time < next_day:
-                self._update_graph()
+            self._update_graph_period(1)
         elif self.update_type == self.UPDATE_WEEKLY:
-            next_week = math.floor(self.actual_time) + 7
-            while self.actual_time < next_week:
-                self._update_graph()
+            self._update_graph_period(7)
         else:
             raise ValueError()
 
         if not only_graph_modification:
             self._update_properties()
+            if self.result_sink is not None:
+                self.result_sink.write_model(self)
+        self.stats.update_finished(self)
         print self.actual_time
         return self.actual_time
 
     def _update_graph(self):
         """Update all parameters which are set for update"""
+        start = timeit.default_timer()
         self.actual_time = self.graph_constructor.get_graph_stepwise_projected()
+        self.stats.record_event(timeit.default_timer() - start)
         self.real_time.update_histogram_data(self.actual_time)
         self.event_counter.total_events += 1
         return self.actual_time
 
+    def _update_graph_period(self, days):
+        """Add the edges of the given number of days"""
+        if not self.graph_constructor.daily_graph:
+            next_period = math.floor(self.actual_time) + days
+            while self.actual_time < next_period:
+                self._update_graph()
+            return
+        # a daily graph is cleared by the first edge of a new day, so the period ends before that edge
+        self._update_graph()
+        next_period = math.floor(self.actual_time) + days
+        while self.graph_constructor.next_edge_time() < next_period:
+            self._update_graph()
+
     def _update_properties(self):
+        """Evaluate all properties which are due according to their cadence and mark the others as missing"""
+        due_properties = []
+        due_resolutions = []
         for network_type in self._network_properties:
-            self._network_properties[network_type].update()
+            network_property = self._network_properties[network_type]
+            resolutions = [resolution for resolution in self._resolutions.get(network_type, {}).values()
+                           if resolution.is_due(self.actual_time)]
+            due_resolutions.extend(resolutions)
+            if resolutions or self._is_due(network_property):
+                # the results of an unchanged graph are reused without scheduling
+                if not self._reuse_result(network_property):
+                    due_properties.append(network_property)
+            else:
+                network_property.mark_missing()
+
+        if self.time_budget is None:
+            self._evaluate_all(due_properties)
+        else:
+            self.scheduler.run(due_properties, self.time_budget)
+        # coinciding boundaries of several resolutions share the same point
+        for resolution in due_resolutions:
+            resolution.sample(self.actual_time)
+
+    def _is_due(self, network_property):
+        cadence = network_property.cadence
+        if cadence == self.CADENCE_EVERY_UPDATE:
+            return True
+        elif cadence == self.CADENCE_ON_OBSERVE:
+            return False
+        return (network_property.last_update_time is None
+                or self.actual_time >= network_property.last_update_time + cadence)
+
+    def _evaluate_all(self, network_properties):
+        if self.parallel_evaluator is not None:
+            # returns the properties which have to be evaluated here
+            network_properties = self.parallel_evaluator.evaluate(network_properties)
+        for network_property in network_properties:
+            self._evaluate(network_property)
+
+    def _evaluate(self, network_property):
+        start = timeit.default_timer()
+        if network_property.memo_key() is None:
+            network_property.update()
+        else:
+            result = network_property.calculate()
+            network_property.apply_result(result)
+            self.memorize(network_property, result)
+        self.evaluated(network_property, timeit.default_timer() - start)
+
+    def _graph_version(self, network_property):
+        if network_property.uses_edge_attributes():
+            return self.graph_constructor.graph_version
+        return self.graph_constructor.topology_version
+
+    def memorize(self, network_property, result):
+        """Remember the result of the actual graph for the properties with the same memo key"""
+        key = network_property.memo_key()
+        if key is not None:
+            self._memo[key] = (self._graph_version(network_property), result)
+
+    def _reuse_result(self, network_property):
+        """Apply the remembered result if the graph did not change since it was calculated"""
+        key = network_property.memo_key()
+        memo = self._memo.get(key) if key is not None else None
+        if memo is None or memo[0] != self._graph_version(network_property):
+            return False
+        start = timeit.default_timer()
+        network_property.apply_external_result(memo[1])
+        # no timing for the scheduler, the estimates are for calculations
+        self.stats.record_property(network_property.property_type, timeit.default_timer() - start)
+        network_property.last_update_time = self.actual_time
+        network_property.dirty = False
+        return True
+
+    def evaluated(self, network_property, seconds):
+        """Bookkeeping after the evaluation of a property"""
+        self.scheduler.record(network_property, seconds)
+        self.stats.record_property(network_property.property_type, seconds)
+        network_property.last_update_time = self.actual_time
+        network_property.dirty = False
+
+    def complete_deferred(self):
+        """Calculate all points which were deferred because of the time budget"""
+        self.scheduler.run_deferred(None)
+
+    def observe(self):
+        """Evaluate the latest point of all properties which are only calculated when observed"""
+        for network_property in self._network_properties.values():
+            if network_property.cadence == self.CADENCE_ON_OBSERVE and network_property.dirty:
+                start = timeit.default_timer()
+                network_property.refresh()
+                self.stats.record_property(network_property.property_type, timeit.default_timer() - start)
+                network_property.last_update_time = self.actual_time
+
+    def set_cadence(self, property_type, cadence):
+        """
+        Set how often a property is evaluated
+        :param cadence: CADENCE_EVERY_UPDATE, CADENCE_ON_OBSERVE or a number of days
+        """
+        if cadence not in [self.CADENCE_EVERY_UPDATE, self.CADENCE_ON_OBSERVE] \
+                and not isinstance(cadence, (int, float)):
+            raise ValueError
+        self.get_network_property_by_name(property_type).cadence = cadence
+
+    def close(self):
+        """Complete the output file of the run"""
+        if self.result_sink is not None:
+            self.result_sink.close()
 
     def reset(self, new_constructor, delete_network_characteristics=False):
+        # the rows of the new run start a new file
+        self.close()
         for network_property_key in self._network_properties:
             network_property = self._network_properties[network_property_key]
             if delete_network_characteristics:
@@ -220,7 +445,27 @@ class Model(object):
                 network_property.reset()
 
         self.actual_time = 0
+        self._memo = {}
+        for property_type in list(self._resolutions):
+            if property_type in self._network_properties:
+                for resolution in self._resolutions[property_type].values():
+                    resolution.reset(self.actual_time)
+            else:
+                del self._resolutions[property_type]
+        for network_property in self._network_properties.values():
+            self._detach_property(network_property)
+        if self._bipartite is not None:
+            self.graph_constructor.remove_step_listener(self._bipartite)
+            new_constructor.add_step_listener(self._bipartite)
+            self._bipartite.clear()
         self.graph_constructor = new_constructor
+        for network_property in self._network_properties.values():
+            self._attach_property(network_property)
+
+    @property
+    def network_properties(self):
+        """All properties of the model by their type"""
+        return self._network_properties
 
     def get_network_property_by_name(self, property_type):
         if property_type not in self._network_properties:
@@ -232,9 +477,216 @@ class Model(object):
         """Return standard domain of stored attributes, i.e. the set time division"""
         return self.time.time_steps
 
+    def time_series(self, property_type):
+        """Return the data of a time series property together with the standard domain"""
+        return TimeSeries(self.domain, self.get_network_property_by_name(property_type).data)
+
+    def add_resolution(self, property_type, update_type):
+        """
+        Sample a time series property additionally at the boundaries of update_type during the same replay,
+        e.g. daily and weekly points of a model with event based updates.
+        The update type of the model has to be at least as fine, since the samples are taken at its updates.
+        :return: the ResolutionSeries
+        """
+        network_property = self.get_network_property_by_name(property_type)
+        if not network_property.is_time_series \
+                or RESOLUTION_ORDER.index(update_type) < RESOLUTION_ORDER.index(self.update_type):
+            raise ValueError
+        resolutions = self._resolutions.setdefault(property_type, {})
+        if update_type not in resolutions:
+            resolutions[update_type] = ResolutionSeries(network_property, update_type, self.actual_time)
+        return resolutions[update_type]
+
+    def resolution_series(self, property_type, update_type):
+        """Return the time series of a property sampled at the boundaries of update_type"""
+        return self._resolutions[property_type][update_type].time_series()
+
     def remove(self, property_type):
+        self._resolutions.pop(property_type, None)
+        self._memo.pop(self._network_properties[property_type].memo_key(), None)
+        self._detach_property(self._network_properties[property_type])
+        self.scheduler.forget(self._network_properties[property_type])
+        self.stats.forget_property(property_type)
         del self._network_properties[property_type]
 
+    @property
+    def graph_size(self):
+        """Number of nodes and edges as measure for the costs of a property"""
+        return self.graph.number_of_nodes() + self.graph.number_of_edges()
+
+
+# update types from the finest to the coarsest sampling
+RESOLUTION_ORDER = [Model.UPDATE_EVENT_BASED, Model.UPDATE_DAILY, Model.UPDATE_WEEKLY]
+
+
+class ResolutionSeries(object):
+    """
+    Points of a time series property at the boundaries of an update type, taken while the model replays the graph
+    at a finer update type.
+
+    Only the indices of the points in the data of the property are kept. So several resolutions share the result
+    of a single evaluation, and points which are calculated later (see PropertyScheduler) appear in all of them.
+    """
+
+    def __init__(self, network_property, update_type, actual_time=0):
+        """
+        :type network_property: NetworkProperty
+        """
+        self.network_property = network_property
+        self.update_type = update_type
+        self.reset(actual_time)
+
+    def reset(self, actual_time=0):
+        self.times = GrowableArray()
+        self.indices = GrowableArray(dtype=np.int64)
+        self._next_boundary = self._boundary_after(actual_time)
+
+    def _boundary_after(self, actual_time):
+        # the same boundaries as Model.update with this update type
+        if self.update_type == Model.UPDATE_DAILY:
+            return math.floor(actual_time) + 1
+        elif self.update_type == Model.UPDATE_WEEKLY:
+            return math.floor(actual_time) + 7
+        return actual_time
+
+    def is_due(self, actual_time):
+        return self.update_type == Model.UPDATE_EVENT_BASED or actual_time >= self._next_boundary
+
+    def sample(self, actual_time):
+        """Take the latest point of the property for this boundary"""
+        self.times.append(actual_time)
+        self.indices.append(len(self.network_property.data) - 1)
+        self._next_boundary = self._boundary_after(actual_time)
+
+    def __len__(self):
+        return len(self.times)
+
+    def time_series(self):
+        """Copy of the sampled points as TimeSeries"""
+        data = self.network_property.data
+        values = np.asarray(data, dtype=float)[self.indices.values] if len(data) else np.empty(0)
+        return TimeSeries(self.times.copy(), GrowableArray(values))
+
+
+class PropertyScheduler(object):
+    """
+    Evaluate the due properties of a model within a time budget per update.
+
+    The costs of each property are estimated from its recent timings relative to the graph size. Cheap properties
+    and the time properties are evaluated on every update, expensive ones only if they fit in the remaining budget.
+    Otherwise their point is marked as missing and calculated later on a copy of the graph, when there is time left.
+    A property deferred max_skips times in a row and the oldest deferred point after max_skips runs without progress
+    are evaluated regardless of the budget, so properties costing more than the whole budget are not starved.
+    """
+
+    def __init__(self, model, number_of_timings=10, cheap_fraction=.1, max_deferred=100, max_skips=5):
+        """
+        :param number_of_timings: number of recent timings used for the estimation
+        :param cheap_fraction: properties estimated below this fraction of the budget are never deferred
+        :param max_deferred: maximal number of deferred points, older ones are skipped
+        :param max_skips: number of runs after which a deferred property or point is evaluated anyway
+        :type model: Model
+        """
+        self.model = model
+        self.number_of_timings = number_of_timings
+        self.cheap_fraction = cheap_fraction
+        self.max_deferred = max_deferred
+        self.max_skips = max_skips
+        # seconds per graph size unit of the recent evaluations of each property
+        self._timings = {}
+        # number of consecutive runs each property was deferred in
+        self._skips = {}
+        # property, its data at deferring, index of the point and the graph copy of each deferred point
+        self._deferred = collections.deque()
+        # number of consecutive runs without calculating a deferred point
+        self._deferred_skips = 0
+
+    def record(self, network_property, seconds, graph_size=None):
+        if graph_size is None:
+            graph_size = self.model.graph_size
+        if network_property not in self._timings:
+            self._timings[network_property] = collections.deque(maxlen=self.number_of_timings)
+        self._timings[network_property].append(seconds / max(graph_size, 1))
+        self._skips.pop(network_property, None)
+
+    def estimate(self, network_property, graph_size=None):
+        """Estimated seconds for evaluating the property or None if unknown"""
+        timings = self._timings.get(network_property)
+        if not timings:
+            return None
+        if graph_size is None:
+            graph_size = self.model.graph_size
+        return sum(timings) / len(timings) * max(graph_size, 1)
+
+    def forget(self, network_property):
+        self._timings.pop(network_property, None)
+        self._skips.pop(network_property, None)
+        self._deferred = collections.deque(job for job in self._deferred if job[0] is not network_property)
+
+    def run(self, due_properties, time_budget):
+        """Evaluate the due properties fitting into the budget, cheapest first, and use the rest for deferred points"""
+        start = timeit.default_timer()
+        graph_size = self.model.graph_size
+        graph_copy = None
+
+        estimates = [(self.estimate(network_property, graph_size), network_property)
+                     for network_property in due_properties]
+        # unknown costs first to get a first timing
+        estimates.sort(key=lambda entry: -1 if entry[0] is None else entry[0])
+        selected_properties = []
+        planned_time = 0
+        for estimate, network_property in estimates:
+            if estimate is None or isinstance(network_property, Time):
+                selected_properties.append(network_property)
+                continue
+            if (estimate <= self.cheap_fraction * time_budget or planned_time + estimate <= time_budget
+                    or self._skips.get(network_property, 0) >= self.max_skips):
+                selected_properties.append(network_property)
+                planned_time += estimate
+                continue
+
+            self._skips[network_property] = self._skips.get(network_property, 0) + 1
+            network_property.mark_missing()
+            if network_property.is_time_series:
+                if graph_copy is None:
+                    graph_copy = self.model.graph.copy()
+                self._deferred.append((network_property, network_property.data, len(network_property.data) - 1,
+                                       graph_copy))
+                if len(self._deferred) > self.max_deferred:
+                    self._deferred.popleft()
+
+        self.model._evaluate_all(selected_properties)
+        self.run_deferred(time_budget - (timeit.default_timer() - start))
+
+    def run_deferred(self, time_budget):
+        """Calculate deferred points, oldest first, as long as they fit into the time budget (None = unlimited)"""
+        start = timeit.default_timer()
+        calculated = False
+        while self._deferred:
+            network_property, data, index, graph = self._deferred[0]
+            graph_size = graph.number_of_nodes() + graph.number_of_edges()
+            # the oldest point is calculated anyway if it was held back too often
+            if time_budget is not None and (calculated or self._deferred_skips < self.max_skips):
+                estimate = self.estimate(network_property, graph_size)
+                if estimate is None or estimate > time_budget - (timeit.default_timer() - start):
+                    break
+            self._deferred.popleft()
+            # data was reset or the point was calculated otherwise
+            if data is not network_property.data or not is_missing(data[index]):
+                continue
+            point_start = timeit.default_timer()
+            data[index] = network_property.evaluate_point(graph)
+            self.record(network_property, timeit.default_timer() - point_start, graph_size)
+            calculated = True
+        if calculated or not self._deferred:
+            self._deferred_skips = 0
+        else:
+            self._deferred_skips += 1
+
+    @property
+    def number_of_deferred(self):
+        return len(self._deferred)
+
 
 class Controller(object):
     DISPLAY_LINE_PLOT = 'line plot'
@@ -259,8 +711,15 @@ class Controller(object):
         self._vertex_display = None
         self.enhanced_display = False
         self._network_type_by_name = {}
-
-    def add_property(self, name, network_property_type, display_type='', domain_type=''):
+        # redraw only the changed plots instead of the whole figure if the canvas supports it
+        self.blitting = True
+        self._blit_manager = None
+        self.network_display = NetworkDisplay()
+        # axes width in pixels of each plot at the last drawing, only replaced as a whole because capture reads it
+        # in the thread of the model
+        self._pixel_widths = {}
+
+    def add_property(self, name, network_property_type, display_type='', domain_type='', cadence=None):
         if name in self._display_handler_by_name:
             raise ValueError
 
@@ -278,6 +737,8 @@ class Controller(object):
                 display_type = self.DISPLAY_LINE_PLOT
 
         network_property = self.model.add_property(network_property_type)
+        if cadence is not None:
+            self.model.set_cadence(network_property_type, cadence)
 
         if not display_type:
             display_type = network_property.standard_display
@@ -328,6 +789,7 @@ class Controller(object):
 
     def reset(self, constructor, delete_network_characteristics=False):
         self.model.reset(constructor, delete_network_characteristics)
+        self.network_display.layout_cache.clear()
         if delete_network_characteristics:
             self._display_order = []
             self._display_handler_by_name = {}
@@ -348,70 +810,86 @@ class Controller(object):
         self._network_type_by_name[name] = network_property_type
         self._network_type_counter[network_property_type] = self._network_type_counter.get(network_property_type, 0) + 1
 
-    def plot(self):
-        """Plot every parameter in a separate graph"""
-        graphs_to_draw = len(self._display_handler_by_name)
+    def capture(self, copy_graph=True):
+        """
+        Return an immutable snapshot of everything needed by plot, so the model can continue while it is drawn
+        :param copy_graph: False to refer to the graph of the model if it is not modified while drawing
+        """
+        self.model.observe()
+        pixel_widths = self._pixel_widths
+        return ControllerSnapshot(
+            self.model.graph.copy() if copy_graph else self.model.graph,
+            self._vertex_display.capture() if self._vertex_display else None,
+            dict((name, self._display_handler_by_name[name].capture(pixel_widths.get(name)))
+                 for name in self._display_order),
+            tuple(self._display_order),
+            self.model.actual_time,
+            None)
+
+    def detached_copy(self):
+        """
+        Return a controller without model which only plots snapshots, e.g. offscreen in another process.
+        The display handlers are copied without their properties and artists.
+        """
+        controller = Controller(None)
+        controller.enhanced_display = self.enhanced_display
+        controller.blitting = False
+        controller._display_order = list(self._display_order)
+        for name, display_handler in self._display_handler_by_name.iteritems():
+            controller._display_handler_by_name[name] = display_handler.detached_copy()
+        controller._network_type_by_name = dict(self._network_type_by_name)
+        return controller
+
+    def plot(self, snapshot=None):
+        """Plot every parameter in a separate graph, from the given snapshot or the actual state"""
+        if snapshot is None:
+            snapshot = self.capture(copy_graph=False)
+        graphs_to_draw = len(snapshot.display_order)
         if graphs_to_draw > 0:
             pl.subplot(2, 1, 1)
-        pl.cla()
         figure = pl.gcf()
         figure.canvas.set_window_title('Network and Property View')
+        if self._blit_manager is None or self._blit_manager.figure is not figure:
+            self._blit_manager = BlitManager(figure)
 
-        if self.enhanced_display:
-            from networkx.drawing.nx_agraph import graphviz_layout
-            main_graph = nx.DiGraph(self.model.graph)
-            for from_node, to_node, edge_data in main_graph.edges(data=True):
-                if Model.ATTRIBUTE_WEIGHT not in edge_data or edge_data[Model.ATTRIBUTE_WEIGHT] < 2:
-                    main_graph.remove_edge(from_node, to_node)
-            node_positions = graphviz_layout(main_graph, prog='sfdp')
-        else:
-            node_positions = nx.circular_layout(self.model.graph)
-        # possible prog = twopi,  fdp, circo, neato, , nop, dot, sfdp.
+        # possible prog for the enhanced display = twopi,  fdp, circo, neato, , nop, dot, sfdp.
         # not working gvcolor, wc, ccomps, tred, sccmap, acyclic, gvpr
-        # nx.draw(self.model.graph, pos)
-        if self._vertex_display:
-            # nx.draw_circular(
-            #     self.model.graph,
-            #     node_color=self._vertex_display.node_color,
-            #     cmap=self._vertex_display.colormap,
-            #     vmin=self._vertex_display.value_min,
-            #     vmax=self._vertex_display.value_max,
-            #     node_size=100,
-            #     arrows=False,
-            # )
-            # node_positions = nx.circular_layout(self.model.graph, scale=2)
-            nx.draw_networkx_nodes(self.model.graph,
-                                   pos=node_positions,
-                                   node_color=self._vertex_display.node_color,
-                                   cmap=self._vertex_display.colormap,
-                                   vmin=self._vertex_display.value_min,
-                                   vmax=self._vertex_display.value_max,
-                                   node_size=100,
-                                   )
-            if self.enhanced_display:
-                nx.draw_networkx_edges(self.model.graph,
-                                       pos=node_positions,
-                                       arrows=False
-                                       )
-
-            # axes = pl.gca()
-            # axes.get_yaxis().set_visible(False)
-            # axes.get_xaxis().set_visible(False)
-            pl.axis('off')
-        else:
-            nx.draw(
-                self.model.graph,
-                node_size=100,
-                arrows=False,
-                pos=node_positions
-            )
+        network_axes = pl.gca()
+        self.network_display.animated = self.blitting
+        full_draw = not self.network_display.plot(network_axes, snapshot.graph, snapshot.vertex_state,
+                                                  self.enhanced_display, snapshot.positions)
         # pl.subplot(2, 1, 2)
         # pl.cla()
-        for i, name in enumerate(self._display_order):
-            pl.subplot(2, graphs_to_draw, graphs_to_draw + 1 + i)
-            self._display_handler_by_name[name].plot()
+        changed_axes = [network_axes]
+        pixel_widths = {}
+        for i, name in enumerate(snapshot.display_order):
+            axes = pl.subplot(2, graphs_to_draw, graphs_to_draw + 1 + i)
+            display_handler = self._display_handler_by_name.get(name)
+            if display_handler is None:
+                # deleted after the snapshot
+                continue
+            display_handler.animated = self.blitting
+            if display_handler.plot(snapshot.display_states[name]):
+                changed_axes.append(axes)
+            else:
+                full_draw = True
+            pixel_widths[name] = max(int(axes.bbox.width), 1)
+        self._pixel_widths = pixel_widths
+        self._blit_manager.draw(full_draw or not self.blitting, changed_axes)
 
     def output_data(self):
+        self.model.complete_deferred()
+        self.model.observe()
+        if self.model.result_sink is not None:
+            # the time series are in the file, only print a summary
+            result_sink = self.model.result_sink
+            result_sink.flush()
+            print ''
+            print 'Actual real-time: ' + str(self.model.actual_time)
+            print 'Total events read: ' + str(self.model.event_counter.total_events)
+            print 'Results: {0} rows written to {1}'.format(result_sink.number_of_rows, result_sink.path)
+            print 'Columns: ' + ', '.join(result_sink.columns or [])
+            return
         # print general information
         print ''
         print ''
@@ -531,6 +1009,12 @@ class Controller(object):
         return 'successfully deleted parameter ' + name
 
 
+# state of the controller for drawing, see Controller.capture
+# positions of the nodes are None to use the layout cache of the network display
+ControllerSnapshot = collections.namedtuple('ControllerSnapshot', ['graph', 'vertex_state', 'display_states',
+                                                                   'display_order', 'actual_time', 'positions'])
+
+
 class AbstractDisplay(object):
     """Abstract base class for displaying a property"""
 
@@ -548,56 +1032,213 @@ class AbstractDisplay(object):
         """
         self.network_property = network_property
         self.title = title
+        # draw the changing artists only on request, see BlitManager
+        self.animated = False
 
-    def plot(self):
+    def capture(self, pixel_width=None):
+        """
+        Return a copy of the data shown by plot
+        :param pixel_width: width in pixels of the axes the state is drawn into, None if unknown
+        """
+        raise NotImplementedError()
+
+    def plot(self, state=None):
+        """
+        Plot the captured state or the actual data into the current axes
+        :return: True if only animated artists changed and the axes can be blitted
+        """
         raise NotImplementedError()
 
+    def detached_copy(self):
+        """Copy without the network property, which can only plot captured states"""
+        display = copy.copy(self)
+        display.network_property = None
+        return display
+
     def output_data(self):
         raise NotImplementedError()
 
 
+class BlitManager(object):
+    """
+    Redraw single axes of a figure by blitting.
+
+    Animated artists are skipped by a full draw of the figure. Therefore the background of each axes is captured
+    after every full draw, and a changed axes is redrawn by restoring its background and drawing its animated
+    artists on top of it.
+    """
+
+    def __init__(self, figure):
+        self.figure = figure
+        self._backgrounds = {}
+        figure.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        canvas = self.figure.canvas
+        self._backgrounds = dict((axes, canvas.copy_from_bbox(axes.bbox)) for axes in self.figure.axes)
+        for axes in self.figure.axes:
+            self._draw_animated(axes)
+
+    @staticmethod
+    def _draw_animated(axes):
+        for artist in axes.get_children():
+            if artist.get_animated() and artist.get_visible():
+                axes.draw_artist(artist)
+
+    def draw(self, full_draw, changed_axes):
+        """Draw the whole figure or only the changed axes"""
+        canvas = self.figure.canvas
+        if full_draw or not getattr(canvas, 'supports_blit', False) \
+                or any(axes not in self._backgrounds for axes in changed_axes):
+            canvas.draw()
+            return
+        for axes in changed_axes:
+            canvas.restore_region(self._backgrounds[axes])
+            self._draw_animated(axes)
+            canvas.blit(axes.bbox)
+
+
+def _expanded_limits(limits, values, log_scale, margin):
+    """Return limits including all values with a relative margin, or None if the given limits include them"""
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    if log_scale:
+        values = np.log10(values[values > 0])
+    if not len(values):
+        return None
+    low, high = values.min(), values.max()
+    if limits is not None:
+        limit_low, limit_high = np.log10(limits) if log_scale else limits
+        if limit_low <= low and high <= limit_high:
+            return None
+    span = high - low or abs(high) or 1.0
+    low, high = low - margin * span, high + margin * span
+    if log_scale:
+        return 10 ** low, 10 ** high
+    return low, high
+
+
 class LinePlot(AbstractDisplay):
+    # scales of the axes
+    x_scale = 'linear'
+    y_scale = 'linear'
+    # relative margin around the data, the axes are only rescaled if the data exceeds the limits
+    rescale_margin = .2
+    # axes width in pixels assumed for the downsampling if it is unknown
+    default_pixel_width = 1000
+
     def __init__(self, network_property, title, domain_supplier):
         super(LinePlot, self).__init__(network_property, title)
         self.domain_supplier = domain_supplier
         self._type = 'Line Plot '
-
-    def plot(self):
-        pl.cla()
-        pl.title(self.title, fontsize=self.font_size_of_title)
-        # if len(self.network_property.data) > 1:
-        #     print self.network_property.data[len(self.network_property.data) - 1]
-        pl.plot(self.domain_supplier.domain, self.network_property.data)
+        self._lines = []
+        self._limits = None
+        # long time series are reduced to about two points per pixel of the axes width
+        self.downsampler = MinMaxDownsampler()
+
+    def capture(self, pixel_width=None):
+        return self._plot_data(pixel_width or self.default_pixel_width)
+
+    def detached_copy(self):
+        display = super(LinePlot, self).detached_copy()
+        display.domain_supplier = None
+        display._lines = []
+        display._limits = None
+        display.downsampler = MinMaxDownsampler()
+        return display
+
+    def plot(self, state=None):
+        if state is None:
+            state = self.capture(max(int(pl.gca().bbox.width), 1))
+        return self._plot_lines([state], ['-'])
+
+    def _plot_lines(self, datasets, line_styles):
+        """
+        Show each domain/data pair as line in the current axes, the lines are kept and only updated with new data.
+        :return: True if only the lines changed
+        """
+        axes = pl.gca()
+        full_draw = not self._lines or self._lines[0].axes is not axes or len(self._lines) != len(line_styles)
+        if full_draw:
+            axes.cla()
+            axes.set_title(self.title, fontsize=self.font_size_of_title)
+            axes.set_xscale(self.x_scale)
+            axes.set_yscale(self.y_scale)
+            axes.set_autoscale_on(False)
+            self._lines = [axes.plot([], [], line_style)[0] for line_style in line_styles]
+            self._limits = None
+
+        for i, line in enumerate(self._lines):
+            if i < len(datasets):
+                line.set_data(*datasets[i])
+            line.set_visible(i < len(datasets))
+            line.set_animated(self.animated)
+
+        return self._rescale(axes, datasets) and not full_draw
+
+    def _rescale(self, axes, datasets):
+        """Set new limits if the data exceeds the actual ones, return True if the limits are kept"""
+        if not datasets:
+            return True
+        old_limits = self._limits or (None, None)
+        limits = []
+        for old, values, scale in zip(old_limits, zip(*datasets), (self.x_scale, self.y_scale)):
+            values = np.concatenate([np.asarray(value, dtype=float) for value in values])
+            limits.append(_expanded_limits(old, values, scale == 'log', self.rescale_margin))
+        if limits == [None, None]:
+            return True
+        self._limits = tuple(new or old for new, old in zip(limits, old_limits))
+        if self._limits[0] is not None:
+            axes.set_xlim(*self._limits[0])
+        if self._limits[1] is not None:
+            axes.set_ylim(*self._limits[1])
+        return False
+
+    def _plot_data(self, pixel_width):
+        """Return domain and data without the points marked as missing, downsampled to the width of the axes"""
+        return self.downsampler.downsample(self.domain_supplier.domain, self.network_property.data, pixel_width)
 
     def output_data(self):
         print self._type + str(self.title)
         print 'Output x/y data'
         print self.domain_supplier.domain
         print self.network_property.data
+        time_series = TimeSeries(self.domain_supplier.domain, self.network_property.data)
+        if len(time_series):
+            print 'mean/min/max: {0} / {1} / {2}'.format(time_series.mean(), time_series.min(), time_series.max())
 
 
 class LogPlot(LinePlot):
+    y_scale = 'log'
+
     def __init__(self, network_property, title, domain_supplier):
         super(LogPlot, self).__init__(network_property, title, domain_supplier)
         self._type = 'Log Plot '
 
-    def plot(self):
-        pl.title(self.title, fontsize=self.font_size_of_title)
-        pl.semilogy(self.domain_supplier.domain, self.network_property.data)
-
 
 class LogLogPlot(LinePlot):
+    x_scale = 'log'
+    y_scale = 'log'
+
     def __init__(self, network_property, title, domain_supplier):
         super(LogLogPlot, self).__init__(network_property, title, domain_supplier)
         self._type = 'LogLog Plot '
 
-    def plot(self):
-        pl.cla()
-        pl.title(self.title, fontsize=self.font_size_of_title)
-        pl.loglog(self.domain_supplier.domain, self.network_property.data)
+
+def _bar_vertices(heights, edges):
+    """Return the corners of one rectangle per bar of a histogram"""
+    left, right = edges[:-1], edges[1:]
+    bottom = np.zeros(len(heights))
+    return np.dstack([np.column_stack([left, left, right, right]),
+                      np.column_stack([bottom, heights, heights, bottom])])
 
 
 class HistogramPlot(AbstractDisplay):
+    """Bars of the precomputed histogram of a property, kept as one collection which is only updated"""
+
+    # relative margin around the bars, the axes are only rescaled if the bars exceed the limits
+    rescale_margin = .2
+
     def __init__(self, network_property, title):
         """
 
@@ -608,39 +1249,93 @@ class HistogramPlot(AbstractDisplay):
         """
         super(HistogramPlot, self).__init__(network_property, title)
         self.network_property = network_property
-
-    def plot(self):
-        pl.cla()
-        pl.title(self.title, fontsize=self.font_size_of_title)
-        pl.hist(self.network_property.histogram_data,
-                bins=self.network_property.bins
-                )
+        self._bars = None
+        self._limits = None
+
+    def capture(self, pixel_width=None):
+        heights, edges = self.network_property.histogram()
+        return np.array(heights, dtype=float), np.array(edges, dtype=float)
+
+    def detached_copy(self):
+        display = super(HistogramPlot, self).detached_copy()
+        display._bars = None
+        display._limits = None
+        return display
+
+    def plot(self, state=None):
+        if state is None:
+            state = self.capture()
+        heights, edges = state
+        axes = pl.gca()
+        full_draw = self._bars is None or self._bars.axes is not axes
+        if full_draw:
+            from matplotlib.collections import PolyCollection
+            axes.cla()
+            axes.set_title(self.title, fontsize=self.font_size_of_title)
+            axes.set_autoscale_on(False)
+            self._bars = PolyCollection([], facecolors='C0', edgecolors='none')
+            axes.add_collection(self._bars)
+            self._limits = None
+        self._bars.set_verts(_bar_vertices(heights, edges))
+        self._bars.set_animated(self.animated)
+
+        # the bars start at zero, so only the top of the y axis grows
+        top = heights.max() if len(heights) else 0
+        x_limits = _expanded_limits(self._limits and self._limits[0], edges, False, self.rescale_margin)
+        y_limits = None
+        if self._limits is None or top > self._limits[1][1]:
+            y_limits = (0, (1 + self.rescale_margin) * top or 1)
+        if x_limits is None and y_limits is None:
+            return not full_draw
+        self._limits = (x_limits or (self._limits[0] if self._limits else (0, 1)), y_limits or self._limits[1])
+        axes.set_xlim(*self._limits[0])
+        axes.set_ylim(*self._limits[1])
+        return False
 
     def output_data(self):
         print 'Histogram ' + str(self.title)
-        print 'Output data/bins'
-        print self.network_property.histogram_data
-        print self.network_property.bins
+        print 'Output heights/bin edges'
+        heights, edges = self.network_property.histogram()
+        print heights
+        print edges
 
 
-class HistoryPlot(AbstractDisplay):
+class HistoryPlot(LinePlot):
     def __init__(self, network_property, title, number_of_historical_plots=1, domain_supplier=None):
-        super(HistoryPlot, self).__init__(network_property, title)
-        self.histories = collections.deque()
-        self.number_of_historical_plots = number_of_historical_plots
         if hasattr(network_property, 'domain') and domain_supplier is None:
-            self.domain_supplier = network_property
+            domain_supplier = network_property
         elif domain_supplier is not None:
             if not hasattr(domain_supplier, 'domain'):
                 raise ValueError
-            self.domain_supplier = domain_supplier
         else:
             raise ValueError
+        super(HistoryPlot, self).__init__(network_property, title, domain_supplier)
+        self.histories = collections.deque()
+        self.number_of_historical_plots = number_of_historical_plots
         self._type = 'History Line Plot'
 
-    def plot(self):
+    def capture(self, pixel_width=None):
         if len(self.network_property.data) > 0:
-            self.plot_complex(self.domain_supplier.domain, self.network_property.data)
+            return TimeSeries(self.domain_supplier.domain, self.network_property.data).valid()
+        return None
+
+    def detached_copy(self):
+        display = super(HistoryPlot, self).detached_copy()
+        display.histories = collections.deque()
+        return display
+
+    def restore_histories(self, states):
+        """Replace the histories by the given previous captured states, oldest first"""
+        self.histories = collections.deque()
+        for state in states[-self.number_of_historical_plots:]:
+            if state is not None:
+                self.histories.extend(state)
+
+    def plot(self, state=None):
+        if state is None:
+            state = self.capture()
+        if state is not None:
+            return self.plot_complex(*state)
 
     def plot_complex(self, domain, data):
         """Plot with domain and data and history"""
@@ -648,25 +1343,24 @@ class HistoryPlot(AbstractDisplay):
         if len(self.histories) > 2 * self.number_of_historical_plots:
             self.histories.popleft()
             self.histories.popleft()
-        pl.cla()
-        pl.title(self.title, fontsize=self.font_size_of_title)
-        self.plot_single(domain, data, '-')
+        datasets = [TimeSeries(domain, data).valid()]
         history_iterator = iter(self.histories)
-        for plot_number in range(len(self.histories) / 2):
+        for _ in range(len(self.histories) / 2):
+            datasets.append(TimeSeries(history_iterator.next(), history_iterator.next()).valid())
+
+        line_styles = ['-']
+        for plot_number in range(self.number_of_historical_plots):
             if plot_number == 0:
-                line_style = '--'
+                line_styles.append('--')
             elif plot_number == 1:
-                line_style = ':'
+                line_styles.append(':')
             else:
-                line_style = '-.'
-            self.plot_single(history_iterator.next(), history_iterator.next(), line_style)
+                line_styles.append('-.')
+        only_lines_changed = self._plot_lines(datasets, line_styles)
 
         self.histories.append(domain)
         self.histories.append(data)
-
-    def plot_single(self, domain, data, line_style='-'):
-        """Plot single data"""
-        pl.plot(domain, data, line_style)
+        return only_lines_changed
 
     def output_data(self):
         print self._type + str(self.title)
@@ -678,21 +1372,24 @@ class HistoryPlot(AbstractDisplay):
 
 
 class LogHistoryPlot(HistoryPlot):
+    y_scale = 'log'
+
     def __init__(self, network_property, title, number_of_historical_plots=1, domain_supplier=None):
         super(LogHistoryPlot, self).__init__(network_property, title, number_of_historical_plots, domain_supplier)
         self._type = 'History Semi-log y Plot'
 
-    def plot_single(self, domain, data, line_style='-'):
-        pl.semilogy(domain, data, line_style)
-
 
 class LogLogHistoryPlot(HistoryPlot):
+    x_scale = 'log'
+    y_scale = 'log'
+
     def __init__(self, network_property, title, number_of_historical_plots=1, domain_supplier=None):
         super(LogLogHistoryPlot, self).__init__(network_property, title, number_of_historical_plots, domain_supplier)
         self._type = 'History LogLog Plot'
 
-    def plot_single(self, domain, data, line_style='-'):
-        pl.loglog(domain, data, line_style)
+
+# colors of the nodes captured from a VertexDisplay
+VertexState = collections.namedtuple('VertexState', ['node_color', 'colormap', 'value_min', 'value_max'])
 
 
 class VertexDisplay(object):
@@ -710,6 +1407,10 @@ class VertexDisplay(object):
     def node_color(self):
         return self.network_property.vertex_data
 
+    def capture(self):
+        node_color = tuple(self.node_color)
+        return VertexState(node_color, self.colormap, self.value_min, self.value_max)
+
     @property
     def value_max(self):
         if self.relative_display:
@@ -725,15 +1426,174 @@ class VertexDisplay(object):
             return self._value_min
 
 
+class LayoutCache(object):
+    """
+    Node positions kept across frames.
+
+    The circular layout is only recalculated when the nodes change. The enhanced layout is calculated once with the
+    graphviz layout program on the graph restricted to the edges with a minimal weight. Later nodes are placed at
+    the centre of their already placed neighbours and optionally refined by a few force-directed iterations,
+    starting from the actual positions and keeping the other nodes fixed.
+    """
+
+    def __init__(self, refine_iterations=0, minimal_weight=2, program='sfdp'):
+        """
+        :param refine_iterations: number of spring layout iterations for new nodes of the enhanced layout
+        :param minimal_weight: only edges with at least this weight are considered by the enhanced layout
+        :param program: graphviz program of the enhanced layout
+        """
+        self.refine_iterations = refine_iterations
+        self.minimal_weight = minimal_weight
+        self.program = program
+        self.positions = {}
+        # increased with each change of the positions
+        self.version = 0
+        self._enhanced = None
+
+    def clear(self):
+        self.positions = {}
+        self._enhanced = None
+        self.version += 1
+
+    def circular(self, graph):
+        if self._enhanced is not False or len(self.positions) != graph.number_of_nodes() \
+                or any(node not in self.positions for node in graph):
+            self.positions = nx.circular_layout(graph)
+            self._enhanced = False
+            self.version += 1
+        return self.positions
+
+    def enhanced(self, graph):
+        weighted_graph = nx.graphviews.subgraph_view(
+            graph, filter_edge=lambda node_u, node_v: graph[node_u][node_v].get(Model.ATTRIBUTE_WEIGHT, 0)
+            >= self.minimal_weight)
+        if self._enhanced is not True or not self.positions:
+            from networkx.drawing.nx_agraph import graphviz_layout
+            self.positions = graphviz_layout(weighted_graph, prog=self.program) if graph.number_of_nodes() else {}
+            self._enhanced = True
+            self.version += 1
+            return self.positions
+
+        new_nodes = [node for node in graph if node not in self.positions]
+        if not new_nodes:
+            return self.positions
+        placed_nodes = list(self.positions)
+        for node in new_nodes:
+            self.positions[node] = self._neighbour_centre(graph, node)
+        if self.refine_iterations:
+            coordinates = np.array(self.positions.values())
+            span = (coordinates.max(axis=0) - coordinates.min(axis=0)).max() or 1.0
+            self.positions = nx.spring_layout(weighted_graph, k=span / math.sqrt(len(self.positions)),
+                                              pos=self.positions, fixed=placed_nodes or None,
+                                              iterations=self.refine_iterations)
+        self.version += 1
+        return self.positions
+
+    def _neighbour_centre(self, graph, node):
+        if graph.is_directed():
+            neighbours = set(graph.predecessors(node)).union(graph.successors(node))
+        else:
+            neighbours = set(graph.neighbors(node))
+        placed = [self.positions[neighbour] for neighbour in neighbours if neighbour in self.positions]
+        if not placed:
+            placed = self.positions.values() or [(0, 0)]
+        centre = np.mean(placed, axis=0)
+        # small offset to separate nodes with the same neighbours
+        coordinates = np.array(self.positions.values() or [(0, 0)])
+        span = (coordinates.max(axis=0) - coordinates.min(axis=0)).max() or 1.0
+        return centre + np.random.uniform(-.05, .05, 2) * span
+
+
+class NetworkDisplay(object):
+    """
+    Network panel with persistent node and edge artists.
+    The artists are updated with the positions of a LayoutCache and the colors of the vertex display, the axes is
+    only redrawn completely when the positions leave its limits.
+    """
+
+    # relative margin around the positions
+    margin = .1
+
+    def __init__(self, layout_cache=None, node_size=100):
+        self.layout_cache = layout_cache or LayoutCache()
+        self.node_size = node_size
+        self.animated = False
+        self._nodes = None
+        self._edges = None
+        self._limits = None
+        self._layout_version = None
+
+    def plot(self, axes, graph, vertex_display=None, enhanced_display=False, positions=None):
+        """
+        Show the graph in axes, return True if only the animated artists changed
+        :param positions: given positions of all nodes instead of the ones of the layout cache
+        """
+        if positions is not None:
+            # the limits are checked for every given set of positions
+            layout_version = object()
+        elif enhanced_display:
+            positions = self.layout_cache.enhanced(graph)
+            layout_version = self.layout_cache.version
+        else:
+            positions = self.layout_cache.circular(graph)
+            layout_version = self.layout_cache.version
+
+        full_draw = self._nodes is None or self._nodes.axes is not axes
+        if full_draw:
+            from matplotlib.collections import LineCollection
+            axes.cla()
+            axes.axis('off')
+            axes.set_autoscale_on(False)
+            self._edges = LineCollection([], colors='k', linewidths=1.0)
+            axes.add_collection(self._edges)
+            self._nodes = axes.scatter([], [], s=self.node_size, c='r')
+            self._limits = None
+            self._layout_version = None
+
+        nodes = list(graph.nodes())
+        offsets = np.array([positions[node] for node in nodes]).reshape(-1, 2)
+        self._nodes.set_offsets(offsets)
+        if vertex_display:
+            self._nodes.set_array(np.asarray(vertex_display.node_color, dtype=float))
+            self._nodes.set_cmap(vertex_display.colormap)
+            self._nodes.set_clim(vertex_display.value_min, vertex_display.value_max)
+        else:
+            self._nodes.set_array(None)
+            self._nodes.set_facecolor('r')
+
+        # like before the edges are hidden for the vertex display, except for the enhanced display
+        self._edges.set_visible(not vertex_display or enhanced_display)
+        if self._edges.get_visible():
+            self._edges.set_segments([(positions[node_u], positions[node_v]) for node_u, node_v in graph.edges()])
+        for artist in (self._nodes, self._edges):
+            artist.set_animated(self.animated)
+
+        if self._layout_version != layout_version and len(offsets):
+            self._layout_version = layout_version
+            limits = [_expanded_limits(old, offsets[:, dimension], False, self.margin)
+                      for dimension, old in enumerate(self._limits or (None, None))]
+            if limits != [None, None]:
+                self._limits = tuple(new or old for new, old in zip(limits, self._limits or (None, None)))
+                axes.set_xlim(*self._limits[0])
+                axes.set_ylim(*self._limits[1])
+                full_draw = True
+        return not full_draw
+
+
 class NetworkProperty(object):
     """Basic class of a network property as part of the model"""
 
+    # the result of the update function only depends on the graph, so it can be calculated by other processes
+    parallel_safe = True
+    # attributes the result depends on besides the graph, see memo_key
+    memo_attributes = ()
+
     def __init__(self, update_function=NotImplemented,
                  update_function_parameter=None):
         """Initialize all needed attributes"""
 
         # Field for storing the data
-        self.data = []
+        self.data = GrowableArray()
 
         # in each iteration the update function is called with the update function parameters
         self.update_function = update_function
@@ -745,17 +1605,103 @@ class NetworkProperty(object):
 
         self.standard_display = Controller.DISPLAY_LINE_PLOT
 
+        # how often the property is evaluated by the model
+        self.cadence = Model.CADENCE_EVERY_UPDATE
+        self.last_update_time = None
+        # True if at least one update was skipped since the last evaluation
+        self.dirty = False
+        # data contains one point per model update
+        self.is_time_series = True
+
     def update(self):
         """Call of saved update function with known parameters"""
-        self.data.append(
-            self.update_function(*self.update_function_parameter)
-        )
+        self.apply_result(self.calculate())
+
+    def calculate(self):
+        """Return the result of the update function for the observed graph"""
+        return self.update_function(*self.update_function_parameter)
+
+    def memo_key(self):
+        """
+        Hashable key of the calculation apart from the graph, None if the result depends on more than the graph.
+        While the graph is unchanged the model reuses the result for all properties with the same key.
+        """
+        if not self.parallel_safe:
+            return None
+        parameters = tuple(id(parameter) if isinstance(parameter, nx.Graph) else parameter
+                           for parameter in self.update_function_parameter if parameter is not self)
+        key = (type(self), self.update_function, parameters, self.memo_parameters())
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def memo_parameters(self):
+        return tuple(getattr(self, attribute) for attribute in self.memo_attributes)
+
+    def uses_edge_attributes(self):
+        """False if the result only depends on the nodes and edges, so it is kept while only the weights change"""
+        return bool(getattr(self, 'weight_attribute', True))
+
+    def apply_result(self, result):
+        """Store the result of the update function"""
+        self.data.append(result)
+
+    def apply_external_result(self, result):
+        """Store a result of the update function which was calculated outside, e.g. by another process"""
+        self.apply_result(result)
+
+    def _bound_graph(self):
+        """Return the graph the update function is called with"""
+        for parameter in self.update_function_parameter:
+            if isinstance(parameter, nx.Graph):
+                return parameter
+        return None
+
+    def mark_missing(self):
+        """Skip the evaluation of this update"""
+        if self.is_time_series:
+            self.data.append(MISSING_VALUE)
+        self.dirty = True
+
+    def evaluate_point(self, graph):
+        """Calculate a single point of the time series for the given graph instead of the observed one"""
+        parameters = [graph if isinstance(parameter, nx.Graph) else parameter
+                      for parameter in self.update_function_parameter]
+        return self.update_function(*parameters)
+
+    def refresh(self):
+        """Evaluate the property for the latest update if it was skipped"""
+        if not self.dirty:
+            return
+        if self.is_time_series and self.data and is_missing(self.data[-1]):
+            self.data.pop()
+        self.update()
+        self.dirty = False
 
     def reset(self):
-        self.data = []
+        self.data = GrowableArray()
+        self.last_update_time = None
+        self.dirty = False
+
+
+class WorkInProgress(NetworkProperty):
+    """Number of orders active at the actual time of the model, from the interval index of its data"""
+
+    # depends on the time of the model instead of the graph
+    parallel_safe = False
+
+    def __init__(self, model):
+        super(WorkInProgress, self).__init__(WorkInProgress.update_data, [self, model])
+
+    def update_data(self, model):
+        return int(model.graph_constructor.data.interval_index.number_of_active_orders(model.actual_time))
 
 
 class HistogramData(NetworkProperty):
+    parallel_safe = False
+
     def __init__(self, update_function=NotImplemented,
                  update_function_parameter=None):
         super(HistogramData, self).__init__(update_function, update_function_parameter)
@@ -771,8 +1717,14 @@ class HistogramData(NetworkProperty):
     def bins(self):
         return abs(int(math.ceil(self._max_value)) - int(math.floor(self._min_value))) + 1
 
+    def histogram(self):
+        """Return the bar heights and the bin edges of the histogram of histogram_data"""
+        return np.histogram(self.histogram_data, bins=self.bins)
+
 
 class Time(NetworkProperty):
+    parallel_safe = False
+
     def _increment(self, timer):
         raise NotImplementedError()
 
@@ -826,7 +1778,9 @@ class RealTime(Time, HistogramData):
         super(RealTime, self).__init__(RealTime._increment, update_function_parameter)
         self.start_time = start_time
         self._next_time = start_time
-        self._histogram_data = []
+        # number of events per day since the first day, instead of the time of every event
+        self._first_day = None
+        self._day_counts = GrowableArray(dtype=np.int64)
         del self._min_value
         del self._max_value
 
@@ -843,37 +1797,280 @@ class RealTime(Time, HistogramData):
         return self._next_time
 
     def update_histogram_data(self, actual_time):
-        self._histogram_data.append(actual_time)
+        """Count an event at the given time in O(1)"""
+        day = int(math.floor(actual_time))
+        if self._first_day is None:
+            self._first_day = day
+        elif day < self._first_day:
+            # only for events which are not ordered by time
+            earlier_days = np.zeros(self._first_day - day, dtype=np.int64)
+            self._day_counts = GrowableArray(np.concatenate([earlier_days, self._day_counts.values]), np.int64)
+            self._first_day = day
+        index = day - self._first_day
+        if index >= len(self._day_counts):
+            self._day_counts.extend(np.zeros(index + 1 - len(self._day_counts), dtype=np.int64))
+        self._day_counts.values[index] += 1
 
     @property
     def histogram_data(self):
-        return self._histogram_data
+        """Number of events of each day of the bins"""
+        return self.histogram()[0]
 
     @property
     def bins(self):
         return range(int(math.floor(self.start_time)), int(math.ceil(self._next_time)) + 1)
 
+    def histogram(self):
+        """Return the events per day between the start and the actual time and the day boundaries"""
+        first_day = int(math.floor(self.start_time))
+        edges = np.arange(first_day, max(int(math.ceil(self._next_time)), first_day + 1) + 1)
+        heights = np.zeros(len(edges) - 1, dtype=np.int64)
+        if self._first_day is not None:
+            start = max(first_day, self._first_day)
+            end = min(edges[-1], self._first_day + len(self._day_counts))
+            if start < end:
+                heights[start - first_day:end - first_day] = self._day_counts[start - self._first_day:
+                                                                              end - self._first_day]
+        return heights, edges
+
     def reset(self):
         super(RealTime, self).reset()
-        self._histogram_data = []
+        self._first_day = None
+        self._day_counts = GrowableArray(dtype=np.int64)
 
 
-class DegreeAssortativity(NetworkProperty):
-    """Parameter subclass for own handling of nx.degree_assortativity() call"""
+class AssortativityTracker(object):
+    """
+    Running moment sums for the Pearson degree correlation over all edges.
 
-    def __init__(self, graph):
-        super(DegreeAssortativity, self).__init__(DegreeAssortativity.update_data,
-                                                  [graph])
+    Each edge (u, v) contributes x = out-degree of u and y = in-degree of v (the degree of both for undirected graphs)
+    like in nx.degree_assortativity_coefficient. Degrees are the sums of the weights if a weight attribute is given.
+    Every edge is counted once or, with edge_weighted, as often as its weight.
+    A modification of (u, v) changes the degrees of u and v and with it the contribution of all their edges,
+    which are updated in O(deg(u) + deg(v)), while the coefficient is available in O(1).
+    """
 
-    @staticmethod
-    def update_data(graph):
+    def __init__(self, directed=True, weight_attribute='weight', edge_weighted=False):
+        self.directed = directed
+        self.weight_attribute = weight_attribute
+        self.edge_weighted = edge_weighted
+        self.reset()
+
+    def reset(self):
+        # edges are stored as arcs, each undirected edge as two arcs (except self loops)
+        self._succ = {}
+        self._pred = {}
+        self._out_degree = {}
+        if self.directed:
+            self._in_degree = {}
+        else:
+            self._in_degree = self._out_degree
+        self.number_of_edges = 0
+        self._count = 0
+        self._sum_x = 0
+        self._sum_y = 0
+        self._sum_xx = 0
+        self._sum_yy = 0
+        self._sum_xy = 0
+
+    def rebuild(self, graph):
+        """Recalculate all sums from scratch"""
+        self.reset()
+        for node_u, node_v, edge_data in graph.edges(data=True):
+            self.edge_changed(node_u, node_v, None, edge_data)
+
+    def _weight(self, edge_data):
+        if edge_data is None:
+            return 0
+        if self.weight_attribute:
+            return edge_data.get(self.weight_attribute, 1)
+        return 1
+
+    def _arc_sums(self, arcs, sign):
+        """Add (sign=1) or remove (sign=-1) the contribution of the given arcs"""
+        for node_s, node_t in arcs:
+            weight = self._succ[node_s].get(node_t)
+            if weight is None:
+                continue
+            multiplicity = sign * (weight if self.edge_weighted else 1)
+            x = self._out_degree[node_s]
+            y = self._in_degree[node_t]
+            self._count += multiplicity
+            self._sum_x += multiplicity * x
+            self._sum_y += multiplicity * y
+            self._sum_xx += multiplicity * x * x
+            self._sum_yy += multiplicity * y * y
+            self._sum_xy += multiplicity * x * y
+
+    def edge_changed(self, node_u, node_v, old_data, new_data):
+        """Update the sums after the edge (u, v) changed from old_data to new_data (None = no edge)"""
+        for node in (node_u, node_v):
+            if node not in self._succ:
+                self._succ[node] = {}
+                self._pred[node] = {}
+                self._out_degree[node] = 0
+                self._in_degree[node] = 0
+
+        if self.directed or node_u == node_v:
+            changed_arcs = [(node_u, node_v)]
+        else:
+            changed_arcs = [(node_u, node_v), (node_v, node_u)]
+
+        # all arcs whose source changes its out-degree or whose target changes its in-degree
+        affected_arcs = set(changed_arcs)
+        for node_s, node_t in changed_arcs:
+            affected_arcs.update((node_s, node) for node in self._succ[node_s])
+            affected_arcs.update((node, node_t) for node in self._pred[node_t])
+
+        self._arc_sums(affected_arcs, -1)
+
+        delta = self._weight(new_data) - self._weight(old_data)
+        if self.directed:
+            self._out_degree[node_u] += delta
+            self._in_degree[node_v] += delta
+        else:
+            # self loops count twice like in nx.Graph.degree
+            self._out_degree[node_u] += delta
+            self._out_degree[node_v] += delta
+
+        for node_s, node_t in changed_arcs:
+            if new_data is None:
+                del self._succ[node_s][node_t]
+                del self._pred[node_t][node_s]
+            else:
+                self._succ[node_s][node_t] = self._weight(new_data)
+                self._pred[node_t][node_s] = self._weight(new_data)
+        if old_data is None:
+            self.number_of_edges += 1
+        elif new_data is None:
+            self.number_of_edges -= 1
+
+        self._arc_sums(affected_arcs, 1)
+
+    def coefficient(self):
+        """Return the Pearson correlation coefficient of the degrees at both ends of the edges"""
+        covariance = self._count * self._sum_xy - self._sum_x * self._sum_y
+        variance = (self._count * self._sum_xx - self._sum_x ** 2) * (self._count * self._sum_yy - self._sum_y ** 2)
+        if variance <= 0:
+            return float('nan')
+        return covariance / math.sqrt(variance)
+
+
+class IncrementalNetworkProperty(NetworkProperty):
+    """
+    Network property maintained from the modifications of the graph instead of recalculated from the whole graph.
+
+    The events of the GraphEventBus of the graph constructor are collected between two evaluations and merged per
+    edge, so an edge modified several times during an update is applied once from its first old to its last new data,
+    an edge added and removed again is dropped. Subclasses implement apply_changes, a cleared graph calls graph_reset.
+    """
+
+    parallel_safe = False
+
+    def __init__(self, update_function=NotImplemented, update_function_parameter=None):
+        super(IncrementalNetworkProperty, self).__init__(update_function, update_function_parameter)
+        self._pending_events = collections.OrderedDict()
+
+    def graph_changed(self, event):
+        """Subscriber function of the GraphEventBus"""
+        if event.kind == data_reader_module.EVENT_GRAPH_CLEARED:
+            # the events before the clear do not matter anymore
+            self._pending_events.clear()
+            self.graph_reset()
+        elif event.kind != data_reader_module.EVENT_NODE_ADDED:
+            self._merge_event(event)
+
+    def _merge_event(self, event):
+        key = (event.node_u, event.node_v)
+        graph = self._bound_graph()
+        if key not in self._pending_events and graph is not None and not graph.is_directed():
+            # both directions are the same edge
+            if (event.node_v, event.node_u) in self._pending_events:
+                key = (event.node_v, event.node_u)
+        pending = self._pending_events.get(key)
+        if pending is None:
+            self._pending_events[key] = event._replace(node_u=key[0], node_v=key[1])
+            return
+        if pending.old_data is None and event.new_data is None:
+            del self._pending_events[key]
+            return
+        if pending.old_data is None:
+            kind = data_reader_module.EVENT_EDGE_ADDED
+        elif event.new_data is None:
+            kind = data_reader_module.EVENT_EDGE_REMOVED
+        else:
+            kind = data_reader_module.EVENT_WEIGHT_CHANGED
+        self._pending_events[key] = pending._replace(kind=kind, new_data=event.new_data)
+
+    def apply_pending(self):
+        """Apply the merged events since the last evaluation"""
+        if self._pending_events:
+            events = self._pending_events.values()
+            self._pending_events = collections.OrderedDict()
+            self.apply_changes(events)
+
+    def apply_changes(self, events):
+        """
+        Update the state with the merged edge events
+        :type events: list[data_reader_module.GraphEvent]
+        """
+        raise NotImplementedError()
+
+    def graph_reset(self):
+        """The graph was cleared, e.g. for daily graphs"""
+        raise NotImplementedError()
+
+    def update(self):
+        self.apply_pending()
+        super(IncrementalNetworkProperty, self).update()
+
+    def reset(self):
+        super(IncrementalNetworkProperty, self).reset()
+        self._pending_events.clear()
+
+
+class DegreeAssortativity(IncrementalNetworkProperty):
+    """
+    Degree assortativity as calculated by nx.degree_assortativity_coefficient(graph, weight='weight').
+    The moment sums are updated incrementally with the modifications reported by the graph constructor.
+    """
+
+    parallel_safe = False
+
+    def __init__(self, graph, weight_attribute='weight'):
+        super(DegreeAssortativity, self).__init__(DegreeAssortativity.update_data, [self, graph])
+        self.graph = graph
+        self.assortativity_tracker = AssortativityTracker(graph.is_directed(), weight_attribute)
+        self.assortativity_tracker.rebuild(graph)
+
+    def update_data(self, graph):
         """Own handling of data call"""
         #        needed because of error when no edge exists
-        if graph.number_of_edges() > 2:
-            return nx.degree_assortativity_coefficient(graph, weight='weight')
+        if self.assortativity_tracker.number_of_edges > 2:
+            return self.assortativity_tracker.coefficient()
         else:
             return 0
 
+    def evaluate_point(self, graph):
+        # the tracker only knows the observed graph
+        if graph.number_of_edges() > 2:
+            assortativity_tracker = AssortativityTracker(graph.is_directed(),
+                                                         self.assortativity_tracker.weight_attribute)
+            assortativity_tracker.rebuild(graph)
+            return assortativity_tracker.coefficient()
+        return 0
+
+    def apply_changes(self, events):
+        for event in events:
+            self.assortativity_tracker.edge_changed(event.node_u, event.node_v, event.old_data, event.new_data)
+
+    def graph_reset(self):
+        self.assortativity_tracker.reset()
+
+    def reset(self):
+        super(DegreeAssortativity, self).reset()
+        self.assortativity_tracker.rebuild(self.graph)
+
 
 class DistributionProperty(HistogramData):
     def __init__(self, update_function=NotImplemented,
@@ -881,19 +2078,24 @@ class DistributionProperty(HistogramData):
                  calculate_accumulated_distribution=True,
                  complementary_accumulated=True):
         super(DistributionProperty, self).__init__(update_function, update_function_parameter)
-        self.domain = []
+        self.domain = GrowableArray()
         self.standard_display = Controller.DISPLAY_HISTORY_LINE_PLOT
         self._histogram_data = []
         self._min_value = 0
         self._iter_function = self._data_iter
         self.calculate_accumulated_distribution = calculate_accumulated_distribution
         self.complementary_accumulated = complementary_accumulated
+        self.is_time_series = False
         self.history = {}
         self.counter = 0
         self.save_history = True
 
+    def _number_of_items(self, graph):
+        """Number of values of the distribution"""
+        return graph.number_of_nodes()
+
     def update_data(self, graph):
-        n = graph.number_of_nodes()
+        n = self._number_of_items(graph)
         if n > 0:
             self._histogram_data = self._get_histogram(graph)
             data = [float(x) / n for x in self._histogram_data]
@@ -940,13 +2142,18 @@ class DistributionProperty(HistogramData):
     def histogram_data(self):
         return self._histogram_data
 
-    def update(self):
-        self.data, self.domain = self.update_function(*self.update_function_parameter)
+    def apply_result(self, result):
+        """Replace the distribution in place, so the arrays are kept over the updates"""
+        data, domain = result
+        self.data.clear()
+        self.data.extend(data)
+        self.domain.clear()
+        self.domain.extend(domain)
 
     def reset(self):
         super(DistributionProperty, self).reset()
         self._histogram_data = []
-        self.domain = []
+        self.domain = GrowableArray()
         if self.save_history:
             print(self.history)
         self.history = {}
@@ -978,6 +2185,29 @@ class DegreeDistribution(DistributionProperty):
                     yield degree
 
 
+class BipartiteDegreeDistribution(DistributionProperty):
+    """Degree distribution of the orders or the machines in the two-mode network of a BipartiteIncidence"""
+
+    def __init__(self, graph, bipartite_incidence, orders=True, weighted=False):
+        """
+        :param orders: True for the degrees of the orders, False for the ones of the machines
+        :param weighted: count the steps instead of the distinct neighbours
+        :type bipartite_incidence: BipartiteIncidence
+        """
+        super(BipartiteDegreeDistribution, self).__init__(BipartiteDegreeDistribution.update_data, [self, graph])
+        self.bipartite_incidence = bipartite_incidence
+        self.orders = orders
+        self.weighted = weighted
+        self.standard_display = Controller.DISPLAY_LOG_LOG_PLOT
+
+    def _number_of_items(self, graph):
+        return len(self.bipartite_incidence.degrees(self.orders, self.weighted))
+
+    def _data_iter(self, graph):
+        # the two-mode network is not part of the (projected) graph
+        return iter(self.bipartite_incidence.degrees(self.orders, self.weighted).tolist())
+
+
 class InDegreeDistribution(DegreeDistribution):
     def _data_iter(self, graph):
         if self.weight_attribute:
@@ -1008,16 +2238,22 @@ class InOutDifferenceDegreeDistribution(HistogramData):
         self._min_value = 0
         self.weight_attribute = weight_attribute
         self.without_outlier = False
+        self.is_time_series = False
 
     def update_data(self, graph):
-        self._min_value = min(self._iter_function(graph))
-        self._max_value = max(self._iter_function(graph))
-        self.data = list(self._iter_function(graph))
+        data = list(self._iter_function(graph))
+        self._min_value = min(data)
+        self._max_value = max(data)
         if self.without_outlier:
-            self.data.remove(self._min_value)
-            self.data.remove(self._max_value)
-            self._min_value = min(self.data)
-            self._max_value = max(self.data)
+            data.remove(self._min_value)
+            data.remove(self._max_value)
+            self._min_value = min(data)
+            self._max_value = max(data)
+        return data
+
+    def apply_result(self, result):
+        # the differences of the latest update replace the previous ones
+        self.data = GrowableArray(result)
 
     def _data_iter(self, graph):
         if self.weight_attribute:
@@ -1044,41 +2280,99 @@ class VertexNetworkProperty(NetworkProperty):
         self.relative_display = True
         self.qualitative_display = False
         self.number_of_qualitative_steps = 10
+        # only vertex properties with an aggregated value per update
+        self.is_time_series = False
+        # values of all nodes of every evaluation, at the actual_time of the time supplier (e.g. the model)
+        self.vertex_history = NodeTimeMatrix()
+        self.save_vertex_history = True
+        self.time_supplier = None
+        # qualitative steps of the flatten vertex data, calculated once per result
+        self._qualitative_steps = None
 
         self.standard_display = Controller.DISPLAY_VERTEX
 
     def update(self):
-        self._vertex_data = self.update_function(*self.update_function_parameter)
+        self.apply_result(self.update_function(*self.update_function_parameter))
+
+    def apply_result(self, result):
+        self._vertex_data = result
+        self._qualitative_steps = None
+        if self.save_vertex_history:
+            time = self.time_supplier.actual_time if self.time_supplier is not None else len(self.vertex_history)
+            self.vertex_history.append(time, result)
         self.aggregate_update()
         if self.relative_display and not self.qualitative_display:
             self.min_value = min(self._vertex_data_flatten)
             self.max_value = max(self._vertex_data_flatten)
 
+    def apply_external_result(self, result):
+        # the flatten vertex data is otherwise set by the update function
+        self._flatten_vertex_data(result, self._bound_graph())
+        self.apply_result(result)
+
     def aggregate_update(self):
         pass
 
+    def aggregate(self, vertex_data):
+        """Aggregated value of the vertex data as point of the time series"""
+        return sum(vertex_data.values()) / float(len(vertex_data))
+
+    def evaluate_point(self, graph):
+        # keep the displayed vertex data
+        vertex_data_flatten = self._vertex_data_flatten
+        vertex_data = super(VertexNetworkProperty, self).evaluate_point(graph)
+        self._vertex_data_flatten = vertex_data_flatten
+        return self.aggregate(vertex_data)
+
     def _flatten_vertex_data(self, data, graph):
         self._vertex_data_flatten = [data[node] for node in graph.nodes()]
 
+    def trajectory(self, node):
+        """Time series of the value of a single node over all evaluations"""
+        return self.vertex_history.trajectory(node)
+
     @property
     def vertex_data(self):
         if self.qualitative_display:
-            length = float(len(self._vertex_data_flatten))
-            actual_step = 0.0
-            last_value = 0
             self.min_value = -.1
             self.max_value = 1
-            for number_of_entries_read, (position, value) in \
-                    enumerate(sorted(enumerate(self._vertex_data_flatten), key=itemgetter(1))):
-                if (number_of_entries_read / length > (actual_step + 1) / self.number_of_qualitative_steps) \
-                        and value != last_value:
-                    actual_step += 1
-                self._vertex_data_flatten[position] = actual_step / self.number_of_qualitative_steps
-                last_value = value
+            if self._qualitative_steps is None:
+                self._qualitative_steps = qualitative_steps(self._vertex_data_flatten,
+                                                            self.number_of_qualitative_steps)
+            return self._qualitative_steps
         return self._vertex_data_flatten
 
+    def reset(self):
+        super(VertexNetworkProperty, self).reset()
+        self.vertex_history = NodeTimeMatrix()
+        self._qualitative_steps = None
+
+
+def qualitative_steps(values, number_of_steps):
+    """
+    Return the quantile step / number_of_steps of each value by its rank.
+    Like before the step grows by at most one per distinct value, so equal values share their step.
+    """
+    values = np.asarray(values, dtype=float)
+    if not len(values):
+        return []
+    order = np.argsort(values, kind='mergesort')
+    sorted_values = values[order]
+    # rank of the first entry of each distinct value
+    starts = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])
+    limits = np.ceil(starts * float(number_of_steps) / len(values)) - 1
+    limits[0] = 0
+    # step of the i-th distinct value: min(previous step + 1, limit), i.e. i + running minimum of limit - i
+    groups = np.arange(len(starts))
+    group_steps = groups + np.minimum.accumulate(limits - groups)
+    steps = np.empty(len(values))
+    steps[order] = np.repeat(group_steps, np.diff(np.r_[starts, len(values)]))
+    return (steps / number_of_steps).tolist()
+
 
 class SimpleVertexNetworkProperty(VertexNetworkProperty):
+    memo_attributes = ('vertex_data_function',)
+
     def __init__(self, graph, vertex_data_function):
         super(SimpleVertexNetworkProperty, self).__init__(SimpleVertexNetworkProperty.update_data, [self, graph])
         self.vertex_data_function = vertex_data_function
@@ -1089,24 +2383,501 @@ class SimpleVertexNetworkProperty(VertexNetworkProperty):
         return data
 
 
-class ClusteringCoefficient(VertexNetworkProperty):
+class TriangleCounter(object):
+    """
+    Incrementally maintained triangle counts for (weighted) clustering coefficients.
+
+    All edges between two nodes are merged into the symmetric strength s(u, v), i.e. the number of edges between both
+    nodes or, in the weighted case, the sum of the cube roots of their weights. The diagonal of s^3 then equals the
+    (weighted) triangle count used by nx.clustering for directed and undirected graphs. A modification of the edge
+    (u, v) changes this diagonal only at u, v and their common neighbours.
+    """
+
+    def __init__(self, directed=True, weight_attribute=''):
+        self.directed = directed
+        self.weight_attribute = weight_attribute
+        self.reset()
+
+    def reset(self):
+        # neighbour -> strength s(node, neighbour) for each node, self loops excluded
+        self._strength = {}
+        # diagonal entries of s^3
+        self._triangles = {}
+        # total degree without self loops and number of bidirectional neighbours (only directed)
+        self._degree = {}
+        self._reciprocal = {}
+        self._edges = set()
+        # clustering coefficient of each node without the normalization by the maximal weight
+        self._clustering = {}
+        self._clustering_sum = 0.0
+        # all weights for the normalization by the maximal weight
+        self._weights = collections.Counter()
+        self._max_weight = None
+
+    def rebuild(self, graph):
+        """Recalculate all counts from scratch"""
+        self.reset()
+        for node in graph.nodes():
+            self._add_node(node)
+        for node_u, node_v, edge_data in graph.edges(data=True):
+            self.edge_changed(node_u, node_v, None, edge_data)
+
+    def _add_node(self, node):
+        if node not in self._strength:
+            self._strength[node] = {}
+            self._triangles[node] = 0
+            self._degree[node] = 0
+            self._reciprocal[node] = 0
+            self._clustering[node] = 0
+
+    def _edge_value(self, edge_data):
+        """Contribution of a single edge to the strength"""
+        if edge_data is None:
+            return 0
+        if self.weight_attribute:
+            return edge_data.get(self.weight_attribute, 1) ** (1.0 / 3)
+        return 1
+
+    def _update_weights(self, old_data, new_data):
+        if old_data is not None:
+            old_weight = old_data.get(self.weight_attribute, 1)
+            self._weights[old_weight] -= 1
+            if self._weights[old_weight] == 0:
+                del self._weights[old_weight]
+                if old_weight == self._max_weight:
+                    self._max_weight = None
+        if new_data is not None:
+            new_weight = new_data.get(self.weight_attribute, 1)
+            self._weights[new_weight] += 1
+            if self._max_weight is not None and new_weight > self._max_weight:
+                self._max_weight = new_weight
+
+    def edge_changed(self, node_u, node_v, old_data, new_data):
+        """Update the counts after the edge (u, v) changed from old_data to new_data (None = no edge)"""
+        self._add_node(node_u)
+        self._add_node(node_v)
+        if self.weight_attribute:
+            self._update_weights(old_data, new_data)
+        if node_u == node_v:
+            return
+
+        changed_nodes = set()
+        if old_data is None or new_data is None:
+            self._update_degree(node_u, node_v, 1 if old_data is None else -1)
+            changed_nodes.update((node_u, node_v))
+
+        delta = self._edge_value(new_data) - self._edge_value(old_data)
+        if delta:
+            strength_u = self._strength[node_u]
+            strength_v = self._strength[node_v]
+            if len(strength_u) > len(strength_v):
+                smaller, larger = strength_v, strength_u
+            else:
+                smaller, larger = strength_u, strength_v
+            common_triangles = 0
+            for node_w, strength_w in smaller.iteritems():
+                if node_w in larger and node_w != node_u and node_w != node_v:
+                    triangles_w = strength_u[node_w] * strength_v[node_w]
+                    self._triangles[node_w] += 2 * delta * triangles_w
+                    common_triangles += triangles_w
+                    changed_nodes.add(node_w)
+            self._triangles[node_u] += 2 * delta * common_triangles
+            self._triangles[node_v] += 2 * delta * common_triangles
+
+            strength = strength_u.get(node_v, 0) + delta
+            if new_data is None and (not self.directed or (node_v, node_u) not in self._edges):
+                del strength_u[node_v]
+                del strength_v[node_u]
+            else:
+                strength_u[node_v] = strength
+                strength_v[node_u] = strength
+            changed_nodes.update((node_u, node_v))
+
+        for node in changed_nodes:
+            self._update_clustering(node)
+
+    def _update_degree(self, node_u, node_v, change):
+        if not self.directed:
+            self._degree[node_u] += change
+            self._degree[node_v] += change
+            return
+
+        if change > 0:
+            self._edges.add((node_u, node_v))
+        else:
+            self._edges.discard((node_u, node_v))
+        self._degree[node_u] += change
+        self._degree[node_v] += change
+        if (node_v, node_u) in self._edges:
+            self._reciprocal[node_u] += change
+            self._reciprocal[node_v] += change
+
+    def _update_clustering(self, node):
+        triangles = self._triangles[node]
+        degree = self._degree[node]
+        if self.directed:
+            normalization = 2 * (degree * (degree - 1) - 2 * self._reciprocal[node])
+        else:
+            normalization = degree * (degree - 1)
+        # as nx.clustering return 0 without any triangle
+        if not triangles or not normalization:
+            clustering = 0
+        else:
+            clustering = float(triangles) / normalization
+        self._clustering_sum += clustering - self._clustering[node]
+        self._clustering[node] = clustering
+
+    @property
+    def max_weight(self):
+        if not self.weight_attribute or not self._weights:
+            return 1
+        if self._max_weight is None:
+            self._max_weight = max(self._weights)
+        return self._max_weight
+
+    def clustering(self):
+        """Return the clustering coefficient of all nodes"""
+        max_weight = float(self.max_weight)
+        return dict((node, clustering / max_weight) for node, clustering in self._clustering.iteritems())
+
+    def average_clustering(self):
+        """Return the average clustering coefficient over all nodes"""
+        if not self._clustering:
+            return 0
+        return self._clustering_sum / self.max_weight / len(self._clustering)
+
+
+class ClusteringCoefficient(IncrementalNetworkProperty, VertexNetworkProperty):
+    """
+    Clustering coefficient of each vertex and its average based on a TriangleCounter.
+    The counts are updated incrementally with the modifications reported by the graph constructor.
+    """
+
+    parallel_safe = False
+
     def __init__(self, graph, weight_attribute=''):
         super(ClusteringCoefficient, self).__init__(ClusteringCoefficient.update_data, [self, graph])
         self.weight_attribute = weight_attribute
+        self.graph = graph
+        self.triangle_counter = TriangleCounter(graph.is_directed(), weight_attribute)
+        self.triangle_counter.rebuild(graph)
+        self.is_time_series = True
 
     def update_data(self, graph):
+        data = self.triangle_counter.clustering()
+        self._vertex_data_flatten = [data.get(node, 0) for node in graph.nodes()]
+        return data
+
+    def aggregate_update(self):
+        self.data.append(self.triangle_counter.average_clustering())
+
+    def evaluate_point(self, graph):
+        # the triangle counter only knows the observed graph
+        triangle_counter = TriangleCounter(graph.is_directed(), self.weight_attribute)
+        triangle_counter.rebuild(graph)
+        return triangle_counter.average_clustering()
+
+    def apply_changes(self, events):
+        for event in events:
+            self.triangle_counter.edge_changed(event.node_u, event.node_v, event.old_data, event.new_data)
+
+    def graph_reset(self):
+        self.triangle_counter.reset()
+
+    def reset(self):
+        super(ClusteringCoefficient, self).reset()
+        self.triangle_counter.rebuild(self.graph)
+
+
+class PushCentralityTracker(object):
+    """
+    Centrality x with x = b + alpha M^T x for a non-negative propagation matrix M of the graph, maintained by local
+    residual pushes.
+
+    Besides the estimates x the residuals r = b + alpha M^T x - x are kept. A push moves the residual of a node into
+    its estimate and spreads alpha times it to its successors, so only the neighbourhood of a node is touched.
+    A modification of the graph only changes the rows of M of the sources of the modified arcs, which changes the
+    residuals of their successors in O(degree). settle pushes until every residual is at most the tolerance.
+    resync recalculates all residuals from the estimates in O(n + m) against accumulated rounding errors.
+    """
+
+    def __init__(self, directed=True, weight_attribute='', alpha=0.85, tolerance=1e-8):
+        """
+        :param tolerance: maximal absolute residual of a node after settle
+        """
+        self.directed = directed
+        self.weight_attribute = weight_attribute
+        self.alpha = alpha
+        self.tolerance = tolerance
+        self.reset()
+
+    def reset(self):
+        # weights of the arcs by their source, each undirected edge as two arcs (except self loops)
+        self._succ = {}
+        self._out_weight = {}
+        self.estimate = {}
+        self._residual = {}
+        self._queue = collections.deque()
+        self._queued = set()
+
+    def rebuild(self, graph):
+        """Recalculate the centrality from scratch"""
+        self.reset()
+        for node in graph.nodes():
+            self._add_node(node)
+        for node_u, node_v, edge_data in graph.edges(data=True):
+            self.edge_changed(node_u, node_v, None, edge_data)
+        self.settle()
+
+    def _weight(self, edge_data):
+        if edge_data is None:
+            return 0
         if self.weight_attribute:
-            data = nx.clustering(graph, weight=self.weight_attribute)
+            return edge_data.get(self.weight_attribute, 1)
+        return 1
+
+    def edge_changed(self, node_u, node_v, old_data, new_data):
+        """Update the residuals after the edge (u, v) changed from old_data to new_data (None = no edge)"""
+        for node in (node_u, node_v):
+            if node not in self._succ:
+                self._add_node(node)
+        weight = self._weight(new_data)
+        self._arc_changed(node_u, node_v, weight)
+        if not self.directed and node_u != node_v:
+            self._arc_changed(node_v, node_u, weight)
+
+    def _set_arc(self, node_s, node_t, weight):
+        """Store the new weight of the arc and return the old one"""
+        successors = self._succ[node_s]
+        old_weight = successors.get(node_t, 0)
+        if weight:
+            successors[node_t] = weight
         else:
-            data = nx.clustering(graph)
-        self._flatten_vertex_data(data, graph)
+            successors.pop(node_t, None)
+        self._out_weight[node_s] += weight - old_weight
+        return old_weight
+
+    def _add_residual(self, node, value):
+        self._residual[node] += value
+        if abs(self._residual[node]) > self.tolerance and node not in self._queued:
+            self._queued.add(node)
+            self._queue.append(node)
+
+    def settle(self):
+        """Push the residuals until all are at most the tolerance"""
+        # diverges if alpha is too large, e.g. alpha >= 1 / spectral radius for the Katz centrality
+        max_pushes = 10000 * (len(self._succ) + 1)
+        pushes = 0
+        while self._queue:
+            node = self._queue.popleft()
+            self._queued.discard(node)
+            residual = self._residual[node]
+            if abs(residual) <= self.tolerance:
+                continue
+            self._residual[node] = 0.0
+            self.estimate[node] += residual
+            self._spread(node, residual)
+            pushes += 1
+            if pushes > max_pushes:
+                raise nx.PowerIterationFailedConvergence(pushes)
+
+    def resync(self):
+        """Recalculate all residuals exactly from the estimates and settle them"""
+        self._residual = self._exact_residuals()
+        self._queue = collections.deque(node for node, residual in self._residual.iteritems()
+                                        if abs(residual) > self.tolerance)
+        self._queued = set(self._queue)
+        self.settle()
+
+    def _add_node(self, node):
+        self._succ[node] = {}
+        self._out_weight[node] = 0
+        self.estimate[node] = 0.0
+        self._residual[node] = 0.0
+
+    def _arc_changed(self, node_s, node_t, weight):
+        raise NotImplementedError()
+
+    def _spread(self, node, residual):
+        raise NotImplementedError()
+
+    def _exact_residuals(self):
+        raise NotImplementedError()
+
+    def centrality(self):
+        raise NotImplementedError()
+
+
+class PageRankTracker(PushCentralityTracker):
+    """
+    PageRank like nx.pagerank, M is the row normalized adjacency and nodes without successors (dangling nodes)
+    jump to all nodes. The teleportation and the jumps of the dangling nodes are spread over all nodes, so they are
+    kept as one uniform residual, which is only added to the residuals of the nodes if it exceeds the tolerance.
+    """
+
+    def reset(self):
+        super(PageRankTracker, self).reset()
+        self._uniform_residual = 0.0
+        # sum of the estimates of the dangling nodes
+        self._dangling_estimate = 0.0
+
+    def _add_node(self, node):
+        old_number = len(self._succ)
+        super(PageRankTracker, self)._add_node(node)
+        number = old_number + 1
+        # teleportation and dangling jumps of all nodes are spread over one more node
+        uniform_share = (1 - self.alpha + self.alpha * self._dangling_estimate) / number
+        if old_number:
+            old_uniform_share = (1 - self.alpha + self.alpha * self._dangling_estimate) / old_number
+            self._uniform_residual += uniform_share - old_uniform_share
+        self._add_residual(node, uniform_share - self._uniform_residual)
+
+    def _arc_changed(self, node_s, node_t, weight):
+        # the whole row of the source changes with its out weight
+        estimate = self.estimate[node_s]
+        self._spread_estimate(node_s, -estimate, self._out_weight[node_s])
+        self._set_arc(node_s, node_t, weight)
+        self._spread_estimate(node_s, estimate, self._out_weight[node_s])
+
+    def _spread_estimate(self, node, estimate, out_weight):
+        """Change the residuals by the contribution of the given estimate of the node"""
+        if out_weight:
+            share = self.alpha * estimate / out_weight
+            for successor, weight in self._succ[node].iteritems():
+                self._add_residual(successor, share * weight)
+        else:
+            self._uniform_residual += self.alpha * estimate / len(self._succ)
+            self._dangling_estimate += estimate
+
+    def _spread(self, node, residual):
+        self._spread_estimate(node, residual, self._out_weight[node])
+
+    def settle(self):
+        while True:
+            if abs(self._uniform_residual) > self.tolerance:
+                uniform_residual = self._uniform_residual
+                self._uniform_residual = 0.0
+                for node in self._residual:
+                    self._add_residual(node, uniform_residual)
+            if not self._queue:
+                break
+            super(PageRankTracker, self).settle()
+
+    def _exact_residuals(self):
+        self._dangling_estimate = sum(estimate for node, estimate in self.estimate.iteritems()
+                                      if not self._out_weight[node])
+        self._uniform_residual = 0.0
+        uniform_share = (1 - self.alpha + self.alpha * self._dangling_estimate) / max(len(self._succ), 1)
+        residuals = dict((node, uniform_share - estimate) for node, estimate in self.estimate.iteritems())
+        for node, successors in self._succ.iteritems():
+            out_weight = self._out_weight[node]
+            for successor, weight in successors.iteritems():
+                residuals[successor] += self.alpha * self.estimate[node] * weight / out_weight
+        return residuals
+
+    def centrality(self):
+        """Return the PageRank of all nodes, normalized to the sum 1"""
+        total = sum(self.estimate.itervalues())
+        if not total:
+            return dict(self.estimate)
+        return dict((node, estimate / total) for node, estimate in self.estimate.iteritems())
+
+
+class KatzTracker(PushCentralityTracker):
+    """
+    Katz centrality like nx.katz_centrality, M is the adjacency and b = beta for all nodes.
+    Converges only for alpha < 1 / spectral radius of the adjacency, otherwise settle raises
+    nx.PowerIterationFailedConvergence like nx.katz_centrality.
+    """
+
+    def __init__(self, directed=True, weight_attribute='', alpha=0.05, tolerance=1e-8, beta=1.0):
+        self.beta = beta
+        super(KatzTracker, self).__init__(directed, weight_attribute, alpha, tolerance)
+
+    def _add_node(self, node):
+        super(KatzTracker, self)._add_node(node)
+        self._add_residual(node, self.beta)
+
+    def _arc_changed(self, node_s, node_t, weight):
+        old_weight = self._set_arc(node_s, node_t, weight)
+        self._add_residual(node_t, self.alpha * (weight - old_weight) * self.estimate[node_s])
+
+    def _spread(self, node, residual):
+        for successor, weight in self._succ[node].iteritems():
+            self._add_residual(successor, self.alpha * weight * residual)
+
+    def _exact_residuals(self):
+        residuals = dict((node, self.beta - estimate) for node, estimate in self.estimate.iteritems())
+        for node, successors in self._succ.iteritems():
+            for successor, weight in successors.iteritems():
+                residuals[successor] += self.alpha * weight * self.estimate[node]
+        return residuals
+
+    def centrality(self):
+        """Return the Katz centrality of all nodes, normalized to the euclidean norm 1"""
+        norm = math.sqrt(sum(estimate ** 2 for estimate in self.estimate.itervalues()))
+        if not norm:
+            return dict(self.estimate)
+        return dict((node, estimate / norm) for node, estimate in self.estimate.iteritems())
+
+
+class PushCentrality(IncrementalNetworkProperty, VertexNetworkProperty):
+    """
+    Vertex centrality of a PushCentralityTracker, which is updated with the modifications reported by the graph
+    constructor instead of a power iteration from scratch for every update.
+    """
+
+    parallel_safe = False
+
+    def __init__(self, graph, tracker, resync_interval=100):
+        """
+        :param resync_interval: number of evaluations after which the residuals are recalculated exactly, 0 = never
+        :type tracker: PushCentralityTracker
+        """
+        super(PushCentrality, self).__init__(PushCentrality.update_data, [self, graph])
+        self.graph = graph
+        self.tracker = tracker
+        self.tracker.rebuild(graph)
+        self.resync_interval = resync_interval
+        self._evaluations = 0
+
+    def update_data(self, graph):
+        self._evaluations += 1
+        if self.resync_interval and self._evaluations % self.resync_interval == 0:
+            self.tracker.resync()
+        data = self.tracker.centrality()
+        self._vertex_data_flatten = [data.get(node, 0) for node in graph.nodes()]
         return data
 
-    def aggregate_update(self):
-        self.data.append(sum(self._vertex_data.values()) / float(len(self._vertex_data)))
+    def apply_changes(self, events):
+        for event in events:
+            self.tracker.edge_changed(event.node_u, event.node_v, event.old_data, event.new_data)
+        self.tracker.settle()
+
+    def graph_reset(self):
+        self.tracker.reset()
+
+    def reset(self):
+        super(PushCentrality, self).reset()
+        self.tracker.rebuild(self.graph)
+        self._evaluations = 0
+
+
+class PageRank(PushCentrality):
+    def __init__(self, graph, weight_attribute='', alpha=0.85, tolerance=1e-8, resync_interval=100):
+        super(PageRank, self).__init__(
+            graph, PageRankTracker(graph.is_directed(), weight_attribute, alpha, tolerance), resync_interval)
+
+
+class KatzCentrality(PushCentrality):
+    def __init__(self, graph, weight_attribute='', alpha=0.05, beta=1.0, tolerance=1e-8, resync_interval=100):
+        super(KatzCentrality, self).__init__(
+            graph, KatzTracker(graph.is_directed(), weight_attribute, alpha, tolerance, beta), resync_interval)
 
 
 class ClosenessCentrality(VertexNetworkProperty):
+    memo_attributes = ('weight_attribute',)
+
     def __init__(self, graph, weight_attribute=''):
         super(ClosenessCentrality, self).__init__(ClosenessCentrality.update_data, [self, graph])
         self.weight_attribute = weight_attribute
@@ -1121,6 +2892,8 @@ class ClosenessCentrality(VertexNetworkProperty):
 
 
 class BetweennessCentrality(VertexNetworkProperty):
+    memo_attributes = ('weight_attribute',)
+
     def __init__(self, graph, weight_attribute=''):
         super(BetweennessCentrality, self).__init__(BetweennessCentrality.update_data, [self, graph])
         self.weight_attribute = weight_attribute
@@ -1135,6 +2908,8 @@ class BetweennessCentrality(VertexNetworkProperty):
 
 
 class MaximumSubgraphProperty(NetworkProperty):
+    memo_attributes = ('weight_attribute',)
+
     def __init__(self, update_function=NotImplemented, update_function_parameter=None, weight_attribute=''):
         super(MaximumSubgraphProperty, self).__init__(update_function, update_function_parameter)
         self.weight_attribute = weight_attribute
@@ -1209,6 +2984,8 @@ class AvgClusteringCoefficientAdaption(MaximumSubgraphProperty):
 
 
 class Efficiency(NetworkProperty):
+    memo_attributes = ('weight_attribute',)
+
     def __init__(self, graph, weight_attribute=''):
         super(Efficiency, self).__init__(Efficiency.update_data, [self, graph])
         self.weight_attribute = weight_attribute
@@ -1239,6 +3016,9 @@ class LocalEfficiency(VertexNetworkProperty):
     def __init__(self, graph, weight_attribute=''):
         super(LocalEfficiency, self).__init__(LocalEfficiency.update_data, [self, graph])
         self.efficiency = Efficiency(graph, weight_attribute)
+        self.is_time_series = True
+        # expensive, therefore only calculated weekly
+        self.cadence = 7
         # self.relative_display = False
         # self.max_value = .7
 
@@ -1259,8 +3039,16 @@ class LocalEfficiency(VertexNetworkProperty):
     def aggregate_update(self):
         self.data.append(sum(self._vertex_data_flatten) / float(len(self._vertex_data_flatten)))
 
+    def memo_parameters(self):
+        return self.efficiency.weight_attribute,
+
+    def uses_edge_attributes(self):
+        return bool(self.efficiency.weight_attribute)
+
 
 class ProportionOfBiggestComponent(NetworkProperty):
+    memo_attributes = ('strong_component', 'weight_attribute')
+
     def __init__(self, graph, weight_attribute='', strong_component=True):
         super(ProportionOfBiggestComponent, self).__init__(ProportionOfBiggestComponent.update_data, [self, graph])
         self.strong_component = strong_component
@@ -1287,3 +3075,177 @@ class ProportionOfBiggestComponent(NetworkProperty):
         else:
             result = float(maximum_value) / graph.size()
         return result
+
+
+class SpectralProperty(NetworkProperty):
+    """
+    Eigenvalue of a sparse matrix of the graph calculated by an iterative eigensolver, which starts with the
+    eigenvector of the previous evaluation. The eigenvectors of consecutive graphs differ only slightly, so the
+    solver needs only a few iterations. Graphs (components for the spectral radius) up to dense_size nodes are solved
+    densely without warm start, the iterative solver would need more setup than the dense one. Needs scipy.
+    """
+
+    memo_attributes = ('weight_attribute', 'tolerance')
+    # number of nodes up to which the dense solver is used
+    dense_size = 16
+
+    def __init__(self, update_function=NotImplemented, update_function_parameter=None, weight_attribute='',
+                 tolerance=1e-8, max_iterations=200):
+        """
+        :param tolerance: residual norm at which the iterative solver stops
+        :param max_iterations: maximal number of iterations of the iterative solver
+        """
+        if scipy is None:
+            raise ImportError('scipy is needed for the spectral properties')
+        super(SpectralProperty, self).__init__(update_function, update_function_parameter)
+        self.weight_attribute = weight_attribute
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        # number of iterations (matrix products for the spectral radius) of the last evaluation, 0 if dense
+        self.iterations = 0
+        self._eigenvector = {}
+        self._random = np.random.RandomState(0)
+
+    def _adjacency(self, graph, nodes):
+        """Adjacency matrix in the order of nodes, which are all nodes of the graph"""
+        return nx.to_scipy_sparse_matrix(graph, nodes, dtype=float, weight=self.weight_attribute or None,
+                                         format='csr')
+
+    def _start_vector(self, nodes):
+        """Eigenvector of the previous evaluation with 0 for new nodes, random without usable previous vector"""
+        vector = np.array([self._eigenvector.get(node, 0.0) for node in nodes])
+        if not np.ptp(vector):
+            vector = self._random.rand(len(nodes))
+        return vector
+
+    def _remember(self, nodes, vector):
+        self._eigenvector = dict(zip(nodes, np.real(vector).tolist()))
+
+    def reset(self):
+        super(SpectralProperty, self).reset()
+        self._eigenvector = {}
+        self.iterations = 0
+
+
+class AlgebraicConnectivity(SpectralProperty):
+    """
+    Second smallest eigenvalue of the Laplacian (Fiedler value) of the undirected projection, 0 if not connected.
+    Edges in both directions are merged, their weights are added. Calculated by LOBPCG orthogonal to the constant
+    vector, preconditioned by the sparse LU factorization of the slightly shifted Laplacian.
+    """
+
+    def __init__(self, graph, weight_attribute='', tolerance=1e-8, max_iterations=200):
+        super(AlgebraicConnectivity, self).__init__(AlgebraicConnectivity.update_data, [self, graph],
+                                                    weight_attribute, tolerance, max_iterations)
+
+    def _laplacian(self, graph, nodes):
+        adjacency = self._adjacency(graph, nodes)
+        if graph.is_directed():
+            adjacency = adjacency + adjacency.T
+            if not self.weight_attribute:
+                adjacency.data[:] = 1
+        # self loops cancel out
+        degrees = np.asarray(adjacency.sum(axis=1)).ravel()
+        return (scipy.sparse.diags(degrees) - adjacency).tocsr()
+
+    def update_data(self, graph):
+        nodes = list(graph.nodes())
+        if len(nodes) < 2:
+            return 0
+        connected = nx.is_weakly_connected(graph) if graph.is_directed() else nx.is_connected(graph)
+        if not connected:
+            return 0
+
+        laplacian = self._laplacian(graph, nodes)
+        if len(nodes) <= self.dense_size:
+            values, vectors = np.linalg.eigh(laplacian.toarray())
+            value, vector = values[1], vectors[:, 1]
+            self.iterations = 0
+        else:
+            constant = np.ones((len(nodes), 1)) / math.sqrt(len(nodes))
+            # nearly the inverse of the Laplacian, the shift makes it regular
+            shift = 1e-3 * laplacian.diagonal().mean()
+            factorization = scipy.sparse.linalg.splu((laplacian + shift * scipy.sparse.identity(len(nodes))).tocsc())
+            preconditioner = scipy.sparse.linalg.LinearOperator(laplacian.shape, matvec=factorization.solve,
+                                                                dtype=float)
+            values, vectors, residual_norms = scipy.sparse.linalg.lobpcg(
+                laplacian, self._start_vector(nodes).reshape(-1, 1), M=preconditioner, Y=constant,
+                tol=self.tolerance, maxiter=self.max_iterations, largest=False, retResidualNormsHistory=True)
+            value, vector = values[0], vectors[:, 0]
+            self.iterations = len(residual_norms)
+        self._remember(nodes, vector)
+        return max(float(value), 0.0)
+
+
+class SpectralRadius(SpectralProperty):
+    """
+    Largest absolute eigenvalue of the adjacency matrix, for the non-negative weights its Perron root.
+    The adjacency matrix is block triangular by the strongly connected components, so the spectral radius is the
+    maximum of the components, acyclic parts contribute 0. Each component is calculated by ARPACK (Lanczos for
+    undirected graphs, Arnoldi otherwise), the eigenvector of the previous evaluation is the start of the iteration.
+    """
+
+    def __init__(self, graph, weight_attribute='', tolerance=1e-8, max_iterations=200):
+        super(SpectralRadius, self).__init__(SpectralRadius.update_data, [self, graph],
+                                             weight_attribute, tolerance, max_iterations)
+
+    def update_data(self, graph):
+        self.iterations = 0
+        if graph.number_of_edges() == 0:
+            self._eigenvector = {}
+            return 0.0
+        if graph.is_directed():
+            components = nx.strongly_connected_components(graph)
+        else:
+            components = nx.connected_components(graph)
+        # the matrix of the whole graph is built once and sliced per component
+        all_nodes = list(graph.nodes())
+        index_by_node = dict((node, index) for index, node in enumerate(all_nodes))
+        graph_adjacency = self._adjacency(graph, all_nodes)
+        eigenvector = {}
+        radius = 0.0
+        for component in components:
+            nodes = list(component)
+            if len(nodes) == 1 and not graph.has_edge(nodes[0], nodes[0]):
+                continue
+            indices = [index_by_node[node] for node in nodes]
+            adjacency = graph_adjacency[indices][:, indices]
+            value, vector = self._component_radius(adjacency, graph.is_directed(), nodes)
+            eigenvector.update(zip(nodes, vector.tolist()))
+            radius = max(radius, value)
+        self._eigenvector = eigenvector
+        return radius
+
+    def _component_radius(self, adjacency, directed, nodes):
+        """Return the spectral radius and the non-negative eigenvector of the component with the given adjacency"""
+        if len(nodes) <= self.dense_size:
+            values, vectors = np.linalg.eig(adjacency.toarray())
+        else:
+            products = [0]
+
+            def multiply(vector):
+                products[0] += 1
+                return adjacency.dot(vector)
+
+            operator = scipy.sparse.linalg.LinearOperator(adjacency.shape, matvec=multiply, dtype=float)
+            start = self._start_vector(nodes)
+            try:
+                values, vectors = self._arpack(operator, directed, start, self.max_iterations)
+            except scipy.sparse.linalg.ArpackNoConvergence as error:
+                # continue from the best approximation with more iterations, raises if it still does not converge
+                if error.eigenvectors.size:
+                    start = np.abs(error.eigenvectors[:, 0])
+                values, vectors = self._arpack(operator, directed, start, 10 * self.max_iterations)
+            finally:
+                self.iterations += products[0]
+        index = np.argmax(np.abs(values))
+        # the Perron vector is non-negative, the solver returns it with an arbitrary phase
+        return float(np.abs(values[index])), np.abs(vectors[:, index])
+
+    def _arpack(self, operator, directed, start, max_iterations):
+        if directed:
+            return scipy.sparse.linalg.eigs(operator, k=1, which='LM', v0=start, tol=self.tolerance,
+                                            maxiter=max_iterations)
+        # symmetric, the largest eigenvalue is the Perron root
+        return scipy.sparse.linalg.eigsh(operator, k=1, which='LA', v0=start, tol=self.tolerance,
+                                         maxiter=max_iterations)
@@ -0,0 +1,182 @@
+"""
+Offscreen rendering of the controller plots for every update into PNG frames or a video, without a display.
+
+The snapshots of the controller are recorded during the run and rendered afterwards by a pool of processes:
+recorder = FrameRecorder(controller, 'snapshots')
+record_updates(recorder, number_of_updates=365)
+recorder.render_video('network.mp4')
+"""
+
+import cPickle as pickle
+import distutils.spawn
+import glob
+import multiprocessing
+import os
+import subprocess
+
+import network_analysis as neta
+
+SNAPSHOT_PATTERN = 'snapshot_{0:06d}.pickle'
+FRAME_PATTERN = 'frame_{0:06d}.png'
+# frame pattern of ffmpeg
+FFMPEG_FRAME_PATTERN = 'frame_%06d.png'
+
+# state of each worker process
+_worker = {}
+
+
+class FrameRecorder(object):
+    """
+    Record a snapshot of the controller after each update into a directory and render them offscreen.
+
+    The snapshots are pickled to files, so the memory stays flat for long runs. The node positions are calculated
+    in order while recording, so the layout is the same as in the GUI although the frames are rendered out of order.
+    """
+
+    def __init__(self, controller, directory, layout_cache=None):
+        """
+        :param directory: directory of the snapshot files, created if needed
+        :type controller: network_analysis.Controller
+        :type layout_cache: network_analysis.LayoutCache
+        """
+        self.controller = controller
+        self.directory = directory
+        self.layout_cache = layout_cache or neta.LayoutCache()
+        self.number_of_frames = 0
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def record(self):
+        """Append a snapshot of the actual state of the controller"""
+        snapshot = self.controller.capture()
+        if self.controller.enhanced_display:
+            positions = self.layout_cache.enhanced(snapshot.graph)
+        else:
+            positions = self.layout_cache.circular(snapshot.graph)
+        snapshot = snapshot._replace(positions=dict((node, tuple(positions[node])) for node in snapshot.graph))
+        filename = _snapshot_file(self.directory, self.number_of_frames)
+        with open(filename, 'wb') as snapshot_file:
+            pickle.dump(snapshot, snapshot_file, pickle.HIGHEST_PROTOCOL)
+        self.number_of_frames += 1
+
+    def snapshot_files(self):
+        return [_snapshot_file(self.directory, index) for index in range(self.number_of_frames)]
+
+    def render(self, output_directory, processes=None, figure_size=(8, 6), dpi=100, chunk_size=16):
+        """
+        Render every recorded snapshot to a PNG file in output_directory and return the file names
+        :param processes: number of worker processes, default is the number of cpus
+        :param chunk_size: number of consecutive frames rendered by a worker at once
+        """
+        return render_frames(self.controller.detached_copy(), self.directory, self.number_of_frames, output_directory,
+                             processes, figure_size, dpi, chunk_size)
+
+    def render_video(self, filename, frames_per_second=10, frame_directory=None, **render_parameters):
+        """
+        Render every recorded snapshot and encode the frames as video with ffmpeg
+        :param frame_directory: directory for the PNG frames, default is the directory 'frames' of the snapshots
+        """
+        frame_directory = frame_directory or os.path.join(self.directory, 'frames')
+        self.render(frame_directory, **render_parameters)
+        encode_video(frame_directory, filename, frames_per_second)
+
+
+def record_updates(recorder, number_of_updates=None):
+    """
+    Update the model of the recorder and record a snapshot after each update until the data ends
+    :type recorder: FrameRecorder
+    """
+    model = recorder.controller.model
+    update = 0
+    while number_of_updates is None or update < number_of_updates:
+        try:
+            model.update()
+        except StopIteration:
+            break
+        recorder.record()
+        update += 1
+
+
+def render_frames(controller, snapshot_directory, number_of_frames, output_directory, processes=None,
+                  figure_size=(8, 6), dpi=100, chunk_size=16):
+    """
+    Render the pickled snapshots with a pool of processes, frame i is written to FRAME_PATTERN.format(i)
+    :param snapshot_directory: directory with the snapshots 0 to number_of_frames - 1 named by SNAPSHOT_PATTERN
+    :param controller: controller without model, see Controller.detached_copy
+    :type controller: network_analysis.Controller
+    """
+    if not os.path.isdir(output_directory):
+        os.makedirs(output_directory)
+    for old_frame in glob.glob(os.path.join(output_directory, 'frame_*.png')):
+        os.remove(old_frame)
+    # the workers derive the snapshot names, so the size of each task does not grow with the number of frames
+    tasks = [(index, snapshot_directory, os.path.join(output_directory, FRAME_PATTERN.format(index)))
+             for index in range(number_of_frames)]
+    pool = multiprocessing.Pool(processes or multiprocessing.cpu_count(), _initialize_worker,
+                                (controller, figure_size, dpi))
+    try:
+        # consecutive frames are rendered by the same worker, so its plots are only updated
+        frames = list(pool.imap(_render_frame, tasks, chunk_size))
+    finally:
+        pool.close()
+        pool.join()
+    return frames
+
+
+def encode_video(frame_directory, filename, frames_per_second=10):
+    """Encode the frames of frame_directory as video with ffmpeg"""
+    ffmpeg = distutils.spawn.find_executable('ffmpeg')
+    if ffmpeg is None:
+        raise OSError('ffmpeg is needed for videos, the frames are in ' + frame_directory)
+    subprocess.check_call([ffmpeg, '-y', '-loglevel', 'error', '-framerate', str(frames_per_second),
+                           '-i', os.path.join(frame_directory, FFMPEG_FRAME_PATTERN),
+                           # even size needed by most codecs
+                           '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', filename])
+
+
+def _snapshot_file(directory, index):
+    return os.path.join(directory, SNAPSHOT_PATTERN.format(index))
+
+
+def _load_snapshot(filename):
+    with open(filename, 'rb') as snapshot_file:
+        return pickle.load(snapshot_file)
+
+
+def _initialize_worker(controller, figure_size, dpi):
+    import matplotlib.pyplot as plt
+    plt.switch_backend('Agg')
+    _worker['controller'] = controller
+    _worker['figure'] = plt.figure(figsize=figure_size, dpi=dpi)
+    _worker['dpi'] = dpi
+    _worker['last index'] = None
+
+
+def _render_frame(task):
+    import matplotlib.pyplot as plt
+    index, snapshot_directory, filename = task
+    controller = _worker['controller']
+    if _worker['last index'] != index - 1:
+        # the histories of previous frames rendered by other workers
+        _restore_histories(controller, snapshot_directory, index)
+    plt.figure(_worker['figure'].number)
+    controller.plot(_load_snapshot(_snapshot_file(snapshot_directory, index)))
+    _worker['figure'].savefig(filename, dpi=_worker['dpi'])
+    _worker['last index'] = index
+    return filename
+
+
+def _restore_histories(controller, snapshot_directory, index):
+    """
+    :type controller: network_analysis.Controller
+    """
+    history_plots = dict((name, display_handler)
+                         for name, display_handler in controller._display_handler_by_name.iteritems()
+                         if isinstance(display_handler, neta.HistoryPlot))
+    if not history_plots:
+        return
+    number_of_frames = max(display_handler.number_of_historical_plots for display_handler in history_plots.values())
+    previous = [_load_snapshot(_snapshot_file(snapshot_directory, previous_index))
+                for previous_index in range(max(index - number_of_frames, 0), index)]
+    for name, display_handler in history_plots.iteritems():
+        display_handler.restore_histories([snapshot.display_states.get(name) for snapshot in previous])
@@ -0,0 +1,171 @@
+"""Parallel evaluation of network properties on a shared memory snapshot of the graph"""
+
+import multiprocessing
+import timeit
+from multiprocessing import sharedctypes
+
+import networkx as nx
+import numpy as np
+
+import network_analysis as neta
+
+# header fields of the snapshot
+_VERSION = 0
+_NUMBER_OF_NODES = 1
+_NUMBER_OF_EDGES = 2
+_DIRECTED = 3
+_WEIGHTED = 4
+
+# state of each worker process
+_worker = {}
+
+
+class ParallelEvaluator(object):
+    """
+    Evaluate independent properties of a model concurrently in a persistent pool of worker processes.
+
+    After each graph update the graph is published as read-only arrays (edge sources, targets and weights) in shared
+    memory, from which each worker rebuilds its own copy of the graph. So the networkx graph is never pickled.
+    The workers return the results of the update functions, which are merged into the properties of the model.
+    Usage: model.parallel_evaluator = ParallelEvaluator(model)
+    """
+
+    def __init__(self, model, processes=None, initial_capacity=1024):
+        """
+        :param processes: number of worker processes, default is the number of cpus
+        :param initial_capacity: number of edges the shared memory is allocated for, it grows if needed
+        :type model: network_analysis.Model
+        """
+        self.model = model
+        self.processes = processes or multiprocessing.cpu_count()
+        self._capacity = initial_capacity
+        self._pool = None
+        self._header = None
+        self._sources = None
+        self._targets = None
+        self._weights = None
+        self._version = 0
+        # node labels of the published snapshot by their index
+        self._node_labels = []
+
+    def _start_pool(self, capacity):
+        self.close()
+        self._capacity = capacity
+        self._header = sharedctypes.RawArray('l', 5)
+        self._sources = sharedctypes.RawArray('i', capacity)
+        self._targets = sharedctypes.RawArray('i', capacity)
+        self._weights = sharedctypes.RawArray('d', capacity)
+        self._pool = multiprocessing.Pool(self.processes, _initialize_worker,
+                                          (self._header, self._sources, self._targets, self._weights))
+
+    def publish(self):
+        """Write the actual graph into the shared memory"""
+        graph = self.model.graph
+        number_of_edges = graph.number_of_edges()
+        if self._pool is None or number_of_edges > self._capacity:
+            capacity = self._capacity
+            while capacity < number_of_edges:
+                capacity *= 2
+            self._start_pool(capacity)
+
+        self._node_labels = list(graph.nodes())
+        node_index = dict((label, index) for index, label in enumerate(self._node_labels))
+        weighted = False
+        sources = np.frombuffer(self._sources, dtype=np.int32)
+        targets = np.frombuffer(self._targets, dtype=np.int32)
+        weights = np.frombuffer(self._weights, dtype=np.float64)
+        for position, (node_u, node_v, edge_data) in enumerate(graph.edges(data=True)):
+            sources[position] = node_index[node_u]
+            targets[position] = node_index[node_v]
+            if neta.Model.ATTRIBUTE_WEIGHT in edge_data:
+                weighted = True
+                weights[position] = edge_data[neta.Model.ATTRIBUTE_WEIGHT]
+            else:
+                weights[position] = 1
+
+        self._version += 1
+        self._header[_VERSION] = self._version
+        self._header[_NUMBER_OF_NODES] = len(self._node_labels)
+        self._header[_NUMBER_OF_EDGES] = number_of_edges
+        self._header[_DIRECTED] = graph.is_directed()
+        self._header[_WEIGHTED] = weighted
+
+    def evaluate(self, network_properties):
+        """
+        Evaluate all parallel safe properties in the worker processes and the others meanwhile in this process
+        :return: list of properties which have to be evaluated by the caller
+        """
+        parallel_properties = [network_property for network_property in network_properties
+                               if network_property.parallel_safe]
+        if not parallel_properties:
+            return network_properties
+
+        self.publish()
+        results = self._pool.map_async(_evaluate_property,
+                                       [(self._version, network_property.property_type)
+                                        for network_property in parallel_properties])
+        for network_property in network_properties:
+            if not network_property.parallel_safe:
+                self.model._evaluate(network_property)
+
+        for network_property, (result, seconds) in zip(parallel_properties, results.get()):
+            if isinstance(result, dict):
+                result = dict((self._node_labels[index], value) for index, value in result.iteritems())
+            network_property.apply_external_result(result)
+            self.model.memorize(network_property, result)
+            self.model.evaluated(network_property, seconds)
+        return []
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+
+def _initialize_worker(header, sources, targets, weights):
+    _worker['header'] = header
+    _worker['arrays'] = []
+    for array, data_type in ((sources, np.int32), (targets, np.int32), (weights, np.float64)):
+        view = np.frombuffer(array, dtype=data_type)
+        view.flags.writeable = False
+        _worker['arrays'].append(view)
+    _worker['version'] = None
+    _worker['graph'] = None
+    _worker['model'] = None
+
+
+def _snapshot_graph(version):
+    """Return the graph of the worker, rebuilt from the shared memory if the version changed"""
+    header = _worker['header']
+    if _worker['graph'] is None:
+        graph = nx.DiGraph() if header[_DIRECTED] else nx.Graph()
+        _worker['graph'] = graph
+        # the properties are bound to this graph, so it is only rebuilt in place
+        _worker['model'] = neta.Model(graph, None)
+
+    graph = _worker['graph']
+    if _worker['version'] != version:
+        number_of_edges = header[_NUMBER_OF_EDGES]
+        sources, targets, weights = [array[:number_of_edges] for array in _worker['arrays']]
+        graph.clear()
+        graph.add_nodes_from(xrange(header[_NUMBER_OF_NODES]))
+        if header[_WEIGHTED]:
+            graph.add_edges_from(
+                (source, target, {neta.Model.ATTRIBUTE_WEIGHT: weight,
+                                  neta.Model.ATTRIBUTE_INVERTED_WEIGHT: 1.0 / weight})
+                for source, target, weight in zip(sources.tolist(), targets.tolist(), weights.tolist()))
+        else:
+            graph.add_edges_from(zip(sources.tolist(), targets.tolist()))
+        _worker['version'] = version
+    return graph
+
+
+def _evaluate_property(task):
+    """Return the result of the update function of the given property type and the needed seconds"""
+    version, property_type = task
+    _snapshot_graph(version)
+    network_property = _worker['model'].add_property(property_type)
+    start = timeit.default_timer()
+    result = network_property.update_function(*network_property.update_function_parameter)
+    return result, timeit.default_timer() - start
@@ -26,6 +26,9 @@
 ## import matplotlib
 ## matplotlib.use('TkAgg')
 
+import threading
+import time
+
 import pylab as PL
 import ttk
 from Tkinter import *
@@ -43,7 +46,8 @@ class GUI:
     currentStep = 0
     
     # Constructor
-    def __init__(self, title='PyCX Simulator', interval=0, stepSize=1, parameterSetters=[], outputFunction=None):
+    def __init__(self, title='PyCX Simulator', interval=0, stepSize=1, parameterSetters=[], outputFunction=None,
+                 statusFunction=None, snapshotFunction=None, frameRate=10):
         self.titleText = title
         self.timeInterval = interval
         self.stepSize = stepSize
@@ -52,6 +56,25 @@ class GUI:
         self.statusStr = ""
 
         self.outputFunction = outputFunction
+        # optional function returning a summary shown in the status line after each step
+        self.statusFunction = statusFunction
+        # with a snapshot function the model runs in a background thread and publishes snapshots of its state,
+        # which are drawn with the given frame rate by passing them to the draw function
+        self.snapshotFunction = snapshotFunction
+        self.frameRate = frameRate
+        self.modelLock = threading.Lock()
+        self.worker = None
+        # set to stop the current worker, each worker gets its own event so a stopped worker that is still
+        # finishing its step can never be revived by the next run
+        self.workerStop = None
+        # the Tk thread keeps at most one renderFrame and one stepModel chain scheduled
+        self.rendering = False
+        self.runGeneration = 0
+        # number of actions of the Tk thread waiting for the model lock, the worker pauses stepping until they ran
+        self.pendingModelActions = 0
+        self.latestSnapshot = None
+        self.latestStatus = None
+        self.workerError = None
                
         self.initGUI()
         
@@ -179,7 +202,7 @@ class GUI:
             self.buttonSaveParametersAndReset.pack(side='top',padx=5,pady=5)
 
         # buttonOutput
-        self.buttonOutput = Button(self.frameParameters, width=30, height=2, text='Output Data', command=self.outputFunction)
+        self.buttonOutput = Button(self.frameParameters, width=30, height=2, text='Output Data', command=self.outputCmd)
         self.buttonOutput.pack(side=TOP, padx=5, pady=5)
         self.showHelp(self.buttonOutput, "Output the current data of the model into the terminal")
     # <<<<< Init >>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>
@@ -190,6 +213,11 @@ class GUI:
         
         
     # model control functions for changing parameters
+    def stepStatus(self):
+        if self.statusFunction is None:
+            return "Step "+str(self.currentStep)
+        return "Step "+str(self.currentStep)+"  "+self.statusFunction()
+
     def changeStepSize(self,val):        
         self.stepSize = int(val)
         
@@ -197,9 +225,31 @@ class GUI:
         self.timeInterval= int(val)
         
     def saveParametersCmd(self):
+        self.whenModelFree(self.saveParameters)
+
+    def saveParameters(self):
         for variableSetter in self.parameterSetters:
             variableSetter(self.varEntries[variableSetter].get())
             self.setStatusStr("New parameter values have been set")
+
+    def outputCmd(self):
+        if self.outputFunction is not None:
+            self.whenModelFree(self.outputFunction)
+
+    def whenModelFree(self, action):
+        """Run the action with the model lock as soon as the worker finished its step, polling instead of blocking Tk"""
+        self.pendingModelActions += 1
+        self.runWithModelLock(action)
+
+    def runWithModelLock(self, action):
+        if not self.modelLock.acquire(False):
+            self.rootWindow.after(10, lambda: self.runWithModelLock(action))
+            return
+        try:
+            self.pendingModelActions -= 1
+            action()
+        finally:
+            self.modelLock.release()
             
     def saveParametersAndResetCmd(self):
         self.saveParametersCmd()
@@ -211,7 +261,12 @@ class GUI:
     def runEvent(self):
         self.running = not self.running
         if self.running:
-            self.rootWindow.after(self.timeInterval,self.stepModel)
+            self.runGeneration += 1
+            if self.snapshotFunction is not None:
+                self.startWorker()
+            else:
+                generation = self.runGeneration
+                self.rootWindow.after(self.timeInterval, lambda: self.stepModel(generation))
             self.runPauseString.set("Pause")
             self.buttonStep.configure(state=DISABLED)
             self.buttonReset.configure(state=DISABLED)
@@ -219,6 +274,7 @@ class GUI:
                 # self.buttonSaveParameters.configure(state=NORMAL)
                 self.buttonSaveParametersAndReset.configure(state=DISABLED)     
         else:
+            self.stopWorker()
             self.runPauseString.set("Continue Run")
             self.buttonStep.configure(state=NORMAL)
             self.buttonReset.configure(state=NORMAL)
@@ -226,39 +282,117 @@ class GUI:
                 # self.buttonSaveParameters.configure(state=NORMAL)
                 self.buttonSaveParametersAndReset.configure(state=NORMAL)
 
-    def stepModel(self):
-        if self.running:
+    def stepModel(self, generation):
+        # a chain scheduled before the last pause ends here, the current run has its own chain
+        if self.running and generation == self.runGeneration:
             self.modelStepFunc()
             self.currentStep += 1
-            self.setStatusStr("Step "+str(self.currentStep))
+            self.setStatusStr(self.stepStatus())
             self.status.configure(foreground='black')
             if (self.currentStep) % self.stepSize == 0:
                 self.drawModel()
-            self.rootWindow.after(int(self.timeInterval*1.0/self.stepSize),self.stepModel)
+            self.rootWindow.after(int(self.timeInterval*1.0/self.stepSize), lambda: self.stepModel(generation))
+
+    # <<<< background stepping >>>>>
+    # The worker thread steps the model and publishes a snapshot whenever the last one was drawn,
+    # the Tk thread draws the latest snapshot with the frame rate, so intermediate states are skipped.
+    # The Tk thread never waits for a worker: a worker stopped in the middle of a step finishes it in the
+    # background, and the next worker starts stepping once it has released the model lock. Actions of the Tk
+    # thread on the model are polled with after until the lock is free, see whenModelFree.
+    def startWorker(self):
+        self.stopWorker()
+        self.workerError = None
+        self.workerStop = threading.Event()
+        self.worker = threading.Thread(target=self.runWorker, args=(self.workerStop,))
+        self.worker.daemon = True
+        self.worker.start()
+        if not self.rendering:
+            self.rendering = True
+            self.rootWindow.after(int(1000.0 / self.frameRate), self.renderFrame)
+
+    def stopWorker(self):
+        if self.workerStop is not None:
+            self.workerStop.set()
+
+    def runWorker(self, stop):
+        try:
+            while not stop.is_set():
+                if self.pendingModelActions:
+                    # the Tk thread gets the model lock between two steps
+                    time.sleep(.01)
+                    continue
+                with self.modelLock:
+                    if stop.is_set():
+                        break
+                    self.modelStepFunc()
+                    self.currentStep += 1
+                    if self.latestSnapshot is None and self.currentStep % self.stepSize == 0:
+                        self.latestStatus = self.stepStatus()
+                        self.latestSnapshot = self.snapshotFunction()
+                # gives the Tk thread the chance to run
+                time.sleep(self.timeInterval / 1000.0)
+        except Exception as error:
+            self.workerError = error
+            stop.set()
+            if stop is self.workerStop:
+                self.running = False
+        # the state after the last step is always drawn
+        with self.modelLock:
+            self.latestStatus = self.stepStatus()
+            self.latestSnapshot = self.snapshotFunction()
+
+    def renderFrame(self):
+        snapshot, self.latestSnapshot = self.latestSnapshot, None
+        if snapshot is not None:
+            self.setStatusStr(self.latestStatus)
+            self.status.configure(foreground='black')
+            self.drawModel(snapshot)
+        if self.running or self.worker.is_alive() or self.latestSnapshot is not None:
+            self.rootWindow.after(int(1000.0 / self.frameRate), self.renderFrame)
+            return
+        self.rendering = False
+        if self.workerError is not None:
+            self.setStatusStr("Stopped: " + repr(self.workerError))
+            self.runPauseString.set("Continue Run")
+            self.buttonStep.configure(state=NORMAL)
+            self.buttonReset.configure(state=NORMAL)
+            if len(self.parameterSetters) > 0:
+                self.buttonSaveParametersAndReset.configure(state=NORMAL)
 
     def stepOnce(self):
         self.running = False
+        self.stopWorker()
         self.runPauseString.set("Continue Run")
+        self.whenModelFree(self.stepModelOnce)
+        # if len(self.parameterSetters) > 0:
+            # self.buttonSaveParameters.configure(state=NORMAL)
+
+    def stepModelOnce(self):
         self.modelStepFunc()
         self.currentStep += 1
-        self.setStatusStr("Step "+str(self.currentStep))
+        self.setStatusStr(self.stepStatus())
         self.drawModel()
-        # if len(self.parameterSetters) > 0:
-            # self.buttonSaveParameters.configure(state=NORMAL)
 
     def resetModel(self):
         self.running = False        
+        self.stopWorker()
         self.runPauseString.set("Run")
+        self.whenModelFree(self.initializeModel)
+
+    def initializeModel(self):
         self.modelInitFunc()
         self.currentStep = 0;
         self.setStatusStr("Model has been reset")
         self.drawModel()
 
-    def drawModel(self):
+    def drawModel(self, snapshot=None):
         PL.ion() # bug fix by Alex Hill in 2013
         if self.modelFigure == None or self.modelFigure.canvas.manager.window == None:
             self.modelFigure = PL.figure()
-        self.modelDrawFunc()
+        if snapshot is None:
+            self.modelDrawFunc()
+        else:
+            self.modelDrawFunc(snapshot)
         self.modelFigure.canvas.manager.window.update()
         PL.show() # bug fix by Hiroki Sayama in 2016
 
@@ -280,6 +414,8 @@ class GUI:
         self.rootWindow.mainloop()
 
     def quitGUI(self):
+        self.running = False
+        self.stopWorker()
         PL.close('all')
         self.rootWindow.quit()
         self.rootWindow.destroy()
@@ -0,0 +1,200 @@
+"""Streaming output of the property time series into columnar files"""
+
+import csv
+import os
+
+import numpy as np
+
+from time_series import GrowableArray
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# column with the real time of each row
+COLUMN_TIME = 'time'
+# column with the number of events read until each row
+COLUMN_EVENTS = 'total events'
+
+
+class ResultSink(object):
+    """
+    Append one row per model update to a file.
+
+    The columns are the real time, the number of events and every time series property of the model at the first
+    written row, properties added later are not written. Rows are buffered and written in chunks, so the memory stays
+    flat and the file can be read while the run continues. Points which were not calculated (yet) are written as nan.
+    After close the next written row starts a new file with the properties of the model at that time.
+    Usage: model.result_sink = create_result_sink('results.npz')
+    """
+
+    def __init__(self, path, chunk_size=100):
+        """
+        :param chunk_size: number of rows buffered before they are written
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.columns = None
+        self.number_of_rows = 0
+        self._buffer = None
+
+    def write_model(self, model):
+        """Append the latest point of all properties of the model
+        :type model: network_analysis.Model
+        """
+        if self.columns is None:
+            self.columns = [COLUMN_TIME, COLUMN_EVENTS] + sorted(
+                property_type for property_type, network_property in model.network_properties.iteritems()
+                if network_property.is_time_series)
+            self._buffer = dict((column, GrowableArray(capacity=self.chunk_size)) for column in self.columns)
+            self.number_of_rows = 0
+            self._start()
+
+        row = {COLUMN_TIME: model.actual_time, COLUMN_EVENTS: model.event_counter.total_events}
+        for column in self.columns[2:]:
+            network_property = model.network_properties.get(column)
+            if network_property is not None and len(network_property.data):
+                row[column] = network_property.data[-1]
+        self.write_row(row)
+
+    def write_row(self, row):
+        """Append a row given as dictionary column -> value, unknown columns are ignored"""
+        for column in self.columns:
+            self._buffer[column].append(row.get(column, np.nan))
+        self.number_of_rows += 1
+        if len(self._buffer[COLUMN_TIME]) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered rows"""
+        if self._buffer is None or not len(self._buffer[COLUMN_TIME]):
+            return
+        self._write_chunk([self._buffer[column].values for column in self.columns])
+        for column in self.columns:
+            self._buffer[column].clear()
+
+    def close(self):
+        """Write all buffered rows and complete the file"""
+        self.flush()
+        self.columns = None
+        self._buffer = None
+
+    def _start(self):
+        """Prepare the file after the columns are known"""
+        pass
+
+    def _write_chunk(self, columns):
+        raise NotImplementedError()
+
+
+class NpzResultSink(ResultSink):
+    """
+    Each chunk is written as compressed file 'part_<n>.npz' of the dataset directory path, readable by np.load.
+    Appending to a single archive would rewrite its central directory on every chunk.
+    """
+
+    def __init__(self, path, chunk_size=100):
+        super(NpzResultSink, self).__init__(path, chunk_size)
+        self._number_of_chunks = 0
+
+    def _start(self):
+        _prepare_dataset(self.path, '.npz')
+        self._number_of_chunks = 0
+
+    def _write_chunk(self, columns):
+        with open(os.path.join(self.path, 'part_{0:05d}.npz'.format(self._number_of_chunks)), 'wb') as part:
+            np.savez_compressed(part, **dict(zip(self.columns, columns)))
+        self._number_of_chunks += 1
+
+
+class CsvResultSink(ResultSink):
+    """Rows appended to a csv file with header, separated by ';' like the input data"""
+
+    def _start(self):
+        with open(self.path, 'wb') as csv_file:
+            csv.writer(csv_file, delimiter=';').writerow(self.columns)
+
+    def _write_chunk(self, columns):
+        with open(self.path, 'ab') as csv_file:
+            csv.writer(csv_file, delimiter=';').writerows(zip(*[values.tolist() for values in columns]))
+
+
+class ParquetResultSink(ResultSink):
+    """
+    Each chunk is written as complete parquet file 'part_<n>.parquet' of the dataset directory path, needs pyarrow.
+    A single file would only be readable after closing its writer, the directory is readable after every chunk.
+    """
+
+    def __init__(self, path, chunk_size=100):
+        if pyarrow is None:
+            raise ImportError('pyarrow is needed for parquet files')
+        super(ParquetResultSink, self).__init__(path, chunk_size)
+        self._number_of_chunks = 0
+
+    def _start(self):
+        _prepare_dataset(self.path, '.parquet')
+        self._number_of_chunks = 0
+
+    def _write_chunk(self, columns):
+        table = pyarrow.Table.from_arrays([pyarrow.array(values) for values in columns], self.columns)
+        pyarrow.parquet.write_table(table, os.path.join(self.path,
+                                                        'part_{0:05d}.parquet'.format(self._number_of_chunks)))
+        self._number_of_chunks += 1
+
+
+def _prepare_dataset(path, extension):
+    """Create the dataset directory path, the parts of an earlier run are replaced"""
+    if os.path.isdir(path):
+        for name in _dataset_parts(path, extension):
+            os.remove(os.path.join(path, name))
+    else:
+        if os.path.exists(path):
+            os.remove(path)
+        os.makedirs(path)
+
+
+def _dataset_parts(path, extension):
+    """Names of the parts of the dataset directory path in the order they were written"""
+    return sorted(name for name in os.listdir(path) if name.startswith('part_') and name.endswith(extension))
+
+
+def create_result_sink(path, chunk_size=100):
+    """Return the sink matching the extension of path, parquet falls back to csv without pyarrow"""
+    root, extension = os.path.splitext(path)
+    if extension == '.npz':
+        return NpzResultSink(path, chunk_size)
+    if extension == '.parquet':
+        if pyarrow is not None:
+            return ParquetResultSink(path, chunk_size)
+        print 'pyarrow not available, results are written to ' + root + '.csv'
+        path = root + '.csv'
+    return CsvResultSink(path, chunk_size)
+
+
+def read_results(path):
+    """Return all rows written so far as dictionary column -> array"""
+    extension = os.path.splitext(path)[1]
+    if extension == '.npz':
+        parts = []
+        for name in _dataset_parts(path, extension):
+            with np.load(os.path.join(path, name)) as part:
+                parts.append(dict((column, part[column]) for column in part.files))
+        if not parts:
+            return {}
+        return dict((column, np.concatenate([part[column] for part in parts])) for column in parts[0])
+    if extension == '.parquet':
+        if pyarrow is None:
+            raise ImportError('pyarrow is needed for parquet files')
+        table = pyarrow.concat_tables([pyarrow.parquet.read_table(os.path.join(path, name))
+                                       for name in _dataset_parts(path, extension)])
+        return dict((name, table.column(name).to_numpy()) for name in table.column_names)
+
+    with open(path, 'rb') as csv_file:
+        reader = csv.reader(csv_file, delimiter=';')
+        columns = reader.next()
+        rows = [[float(value) for value in row] for row in reader]
+    if not rows:
+        return dict((column, np.empty(0)) for column in columns)
+    return dict(zip(columns, np.array(rows).T))
@@ -0,0 +1,60 @@
+"""Generator of synthetic production data in the format read by data_reader_module.read_data_from_file"""
+
+import random
+
+# every order takes its own random sequence of machines
+ROUTING_RANDOM = 'random'
+# all orders pass the machines in the same order, skipping some of them
+ROUTING_FLOW_SHOP = 'flow shop'
+# each order follows one of a few fixed routes (product families)
+ROUTING_JOB_SHOP = 'job shop'
+
+
+def generate_orders(number_of_orders=1000, number_of_machines=20, routing=ROUTING_JOB_SHOP, number_of_routes=5,
+                    min_steps=2, max_steps=8, rework_probability=.05, time_span=100.0,
+                    min_duration=.05, max_duration=1.0, max_waiting=.5, seed=None):
+    """
+    Yield the lines (order_id, machine_id, start_time, end_time) of synthetic orders, grouped by order.
+    :param routing: ROUTING_RANDOM, ROUTING_FLOW_SHOP or ROUTING_JOB_SHOP
+    :param number_of_routes: number of fixed routes for ROUTING_JOB_SHOP
+    :param rework_probability: probability after each step to go back and repeat the previous and the actual step
+    :param time_span: the orders start uniformly distributed in [0, time_span] days
+    :param seed: seed of the random generator for reproducible data
+    """
+    if min_steps < 2 or max_steps < min_steps:
+        # orders with a single step are skipped by the reader
+        raise ValueError()
+    generator = random.Random(seed)
+    machines = range(1, number_of_machines + 1)
+    routes = [[generator.choice(machines) for _ in range(max_steps)] for _ in range(number_of_routes)]
+
+    for order_id in xrange(number_of_orders):
+        number_of_steps = generator.randint(min_steps, max_steps)
+        if routing == ROUTING_RANDOM:
+            route = [generator.choice(machines) for _ in range(number_of_steps)]
+        elif routing == ROUTING_FLOW_SHOP:
+            route = sorted(generator.sample(machines, min(number_of_steps, number_of_machines)))
+        elif routing == ROUTING_JOB_SHOP:
+            route = generator.choice(routes)[:number_of_steps]
+        else:
+            raise ValueError()
+
+        machine_sequence = []
+        for step_index, machine_id in enumerate(route):
+            machine_sequence.append(machine_id)
+            if step_index > 0 and generator.random() < rework_probability:
+                machine_sequence.extend([route[step_index - 1], machine_id])
+
+        time = generator.uniform(0, time_span)
+        for machine_id in machine_sequence:
+            duration = generator.uniform(min_duration, max_duration)
+            yield order_id, machine_id, time, time + duration
+            time += duration + generator.uniform(0, max_waiting)
+
+
+def write_data_file(filename, **parameters):
+    """Write synthetic orders to filename, the parameters are the ones of generate_orders"""
+    with open(filename, 'w') as data_file:
+        data_file.write('order;machine;start;end\n')
+        for order_id, machine_id, start_time, end_time in generate_orders(**parameters):
+            data_file.write('{0};{1};{2:.6f};{3:.6f}\n'.format(order_id, machine_id, start_time, end_time))
@@ -0,0 +1,109 @@
+"""Index of the projected machine network of every day for graphs of arbitrary time windows"""
+
+import math
+
+import networkx as nx
+import numpy as np
+
+import data_reader_module
+import network_analysis as neta
+
+try:
+    import scipy.sparse
+except ImportError:
+    scipy = None
+
+
+class TemporalAdjacencyIndex(object):
+    """
+    Cumulative sparse adjacency counts of the projected machine network per day.
+
+    Entry (u, v) of the matrix of day d is the number of projected edges u -> v read on the days up to d, so the
+    network of the days d1 to d2 is the difference of the matrices of d2 and d1 - 1. The whole data is replayed once
+    while building the index, a window needs a single sparse subtraction. Days without events share the matrix of
+    the previous day. Needs scipy.
+    """
+
+    def __init__(self, data, next_method=None):
+        """
+        :param next_method: Order.START_TIME_NEXT or Order.FOLLOWING_NEXT like for the graph constructors
+        :type data: data_reader_module.Data
+        """
+        if scipy is None:
+            raise ImportError('scipy is needed for the temporal adjacency index')
+        self.nodes = []
+        self._node_index = {}
+        self.first_day = None
+        self.last_day = None
+        self._cumulative = []
+        self._build(data, next_method)
+
+    def _index(self, node):
+        if node not in self._node_index:
+            self._node_index[node] = len(self.nodes)
+            self.nodes.append(node)
+        return self._node_index[node]
+
+    def _build(self, data, next_method):
+        # the constructor only projects the steps, its graph stays empty
+        constructor = data_reader_module.NxGraphConstructor(data, nx.DiGraph(), next_method=next_method)
+        days, sources, targets = [], [], []
+        while True:
+            try:
+                time, (node_u, node_v) = constructor.get_graph_stepwise_projected(add_edge=False)
+            except StopIteration:
+                break
+            days.append(int(math.floor(time)))
+            sources.append(self._index(node_u))
+            targets.append(self._index(node_v))
+        if not days:
+            return
+
+        days = np.array(days)
+        order = np.argsort(days, kind='mergesort')
+        days, sources, targets = days[order], np.array(sources)[order], np.array(targets)[order]
+        self.first_day, self.last_day = int(days[0]), int(days[-1])
+        shape = (len(self.nodes), len(self.nodes))
+        boundaries = np.searchsorted(days, np.arange(self.first_day, self.last_day + 2))
+        cumulative = scipy.sparse.csr_matrix(shape)
+        for start, end in zip(boundaries[:-1], boundaries[1:]):
+            if end > start:
+                day_counts = scipy.sparse.csr_matrix((np.ones(end - start), (sources[start:end], targets[start:end])),
+                                                     shape=shape)
+                cumulative = cumulative + day_counts
+            self._cumulative.append(cumulative)
+
+    def _until(self, day):
+        """Cumulative counts of all days up to day"""
+        if self.first_day is None or day < self.first_day:
+            return scipy.sparse.csr_matrix((len(self.nodes), len(self.nodes)))
+        return self._cumulative[min(day, self.last_day) - self.first_day]
+
+    def window_matrix(self, start_time, end_time):
+        """
+        Sparse matrix of the number of edges between the nodes read on the days of start_time to end_time
+        (both including), the rows and columns are ordered like nodes
+        """
+        start_day, end_day = int(math.floor(start_time)), int(math.floor(end_time))
+        if end_day < start_day:
+            raise ValueError()
+        return self._until(end_day) - self._until(start_day - 1)
+
+    def window_array(self, start_time, end_time):
+        """Dense version of window_matrix"""
+        return self.window_matrix(start_time, end_time).toarray()
+
+    def window_graph(self, start_time, end_time, graph=None):
+        """
+        Return the network of the days of start_time to end_time with the weights of the graph constructors
+        :param graph: empty graph to fill, default is a new nx.DiGraph
+        """
+        if graph is None:
+            graph = nx.DiGraph()
+        counts = self.window_matrix(start_time, end_time).tocoo()
+        for row, column, count in zip(counts.row.tolist(), counts.col.tolist(), counts.data.tolist()):
+            if count:
+                graph.add_edge(self.nodes[row], self.nodes[column],
+                               **{neta.Model.ATTRIBUTE_WEIGHT: int(count),
+                                  neta.Model.ATTRIBUTE_INVERTED_WEIGHT: 1.0 / count})
+        return graph
@@ -0,0 +1,38 @@
+"""Edge modifications of a replay of synthetic orders for testing the incrementally maintained properties"""
+
+import random
+
+import networkx as nx
+
+import synthetic_data
+
+
+def replay_edge_changes(directed, number_of_orders=60, number_of_machines=12, removal_interval=7, seed=1):
+    """
+    Yield the graph and the modified edge (u, v, old data, new data) after each modification of the graph.
+    Consecutive steps of an order add an edge or increase its weight, repeated steps on the same machine add self
+    loops. Every removal_interval modifications a random edge is removed.
+    """
+    graph = nx.DiGraph() if directed else nx.Graph()
+    generator = random.Random(seed)
+    last_machine_by_order = {}
+    number_of_changes = 0
+    for order_id, machine_id, _, _ in synthetic_data.generate_orders(
+            number_of_orders, number_of_machines, synthetic_data.ROUTING_RANDOM, rework_probability=.2, seed=seed):
+        last_machine = last_machine_by_order.get(order_id)
+        last_machine_by_order[order_id] = machine_id
+        if last_machine is None:
+            continue
+        if generator.random() < .1:
+            # rework on the same machine
+            last_machine = machine_id
+        old_data = dict(graph[last_machine][machine_id]) if graph.has_edge(last_machine, machine_id) else None
+        graph.add_edge(last_machine, machine_id, weight=(old_data or {}).get('weight', 0) + 1)
+        yield graph, (last_machine, machine_id, old_data, dict(graph[last_machine][machine_id]))
+
+        number_of_changes += 1
+        if number_of_changes % removal_interval == 0:
+            node_u, node_v = generator.choice(sorted(graph.edges()))
+            old_data = dict(graph[node_u][node_v])
+            graph.remove_edge(node_u, node_v)
+            yield graph, (node_u, node_v, old_data, None)
@@ -0,0 +1,40 @@
+import math
+import unittest
+
+import matplotlib
+
+matplotlib.use('Agg')
+# noinspection PyPep8
+import networkx as nx
+# noinspection PyPep8
+import numpy as np
+# noinspection PyPep8
+import network_analysis as neta
+# noinspection PyPep8
+from tests.replay import replay_edge_changes
+
+
+class AssortativityTrackerTest(unittest.TestCase):
+
+    def check_replay(self, directed):
+        assortativity_tracker = neta.AssortativityTracker(directed, weight_attribute='')
+        for graph, edge_change in replay_edge_changes(directed):
+            assortativity_tracker.edge_changed(*edge_change)
+            # nan without variance of the degrees
+            with np.errstate(invalid='ignore', divide='ignore'):
+                expected = nx.degree_assortativity_coefficient(graph)
+            coefficient = assortativity_tracker.coefficient()
+            if math.isnan(expected):
+                self.assertTrue(math.isnan(coefficient))
+            else:
+                self.assertAlmostEqual(coefficient, expected, places=10)
+
+    def test_directed(self):
+        self.check_replay(True)
+
+    def test_undirected(self):
+        self.check_replay(False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import collections
+import math
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from StringIO import StringIO
+
+import matplotlib
+
+matplotlib.use('Agg')
+# noinspection PyPep8
+import networkx as nx
+# noinspection PyPep8
+import data_reader_module
+# noinspection PyPep8
+import network_analysis as neta
+# noinspection PyPep8
+import synthetic_data
+
+
+class DailyGraphTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        filename = os.path.join(self.directory, 'orders.csv')
+        synthetic_data.write_data_file(filename, number_of_orders=200, number_of_machines=10, time_span=20.0, seed=1)
+        self.data = data_reader_module.read_data_from_file(filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_event_based(self):
+        """After each edge the daily graph holds the edges of its day read so far, also on the day boundaries"""
+        graph = nx.DiGraph()
+        constructor = data_reader_module.NxGraphConstructor(self.data, graph, daily_graph=True)
+        reference = data_reader_module.NxGraphConstructor(self.data, nx.DiGraph())
+        day = None
+        weights = collections.Counter()
+        while True:
+            try:
+                time, edge = reference.get_graph_stepwise_projected(add_edge=False)
+            except StopIteration:
+                self.assertRaises(StopIteration, constructor.get_graph_stepwise_projected)
+                break
+            if math.floor(time) != day:
+                day = math.floor(time)
+                weights.clear()
+            weights[edge] += 1
+            self.assertEqual(constructor.get_graph_stepwise_projected(), time)
+            self.assertEqual(dict(((u, v), data['weight']) for u, v, data in graph.edges(data=True)), weights)
+
+    def test_daily_update(self):
+        """Each daily update of the model evaluates the complete graph of one day"""
+        reference_graph = nx.DiGraph()
+        reference = data_reader_module.NxGraphConstructor(self.data, reference_graph)
+        expected = []
+        try:
+            while True:
+                reference.get_daily_graph(clear_graph=True)
+                expected.append(reference_graph.size('weight'))
+        except StopIteration:
+            # the last day is left in the graph
+            expected.append(reference_graph.size('weight'))
+
+        graph = nx.DiGraph()
+        model = neta.Model(graph, data_reader_module.NxGraphConstructor(self.data, graph, daily_graph=True),
+                           neta.Model.UPDATE_DAILY)
+        sizes = []
+        stdout, sys.stdout = sys.stdout, StringIO()
+        try:
+            while True:
+                model.update()
+                sizes.append(graph.size('weight'))
+        except StopIteration:
+            pass
+        finally:
+            sys.stdout = stdout
+        self.assertEqual(sizes, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+import matplotlib
+
+matplotlib.use('Agg')
+# noinspection PyPep8
+import networkx as nx
+# noinspection PyPep8
+import network_analysis as neta
+# noinspection PyPep8
+from tests.replay import replay_edge_changes
+
+KATZ_ALPHA = .02
+
+
+class PushCentralityTest(unittest.TestCase):
+
+    def check_replay(self, tracker, reference):
+        for graph, edge_change in replay_edge_changes(tracker.directed):
+            tracker.edge_changed(*edge_change)
+            tracker.settle()
+            expected = reference(graph)
+            centrality = tracker.centrality()
+            for node in graph:
+                self.assertAlmostEqual(centrality[node], expected[node], places=6)
+
+    @staticmethod
+    def pagerank(graph):
+        return nx.pagerank(graph, weight=None, tol=1e-12, max_iter=1000)
+
+    @staticmethod
+    def katz_centrality(graph):
+        return nx.katz_centrality(graph, alpha=KATZ_ALPHA, weight=None, tol=1e-12, max_iter=10000)
+
+    def test_pagerank_directed(self):
+        self.check_replay(neta.PageRankTracker(True), self.pagerank)
+
+    def test_pagerank_undirected(self):
+        self.check_replay(neta.PageRankTracker(False), self.pagerank)
+
+    def test_katz_directed(self):
+        self.check_replay(neta.KatzTracker(True, alpha=KATZ_ALPHA), self.katz_centrality)
+
+    def test_katz_undirected(self):
+        self.check_replay(neta.KatzTracker(False, alpha=KATZ_ALPHA), self.katz_centrality)
+
+    def test_resync(self):
+        tracker = neta.PageRankTracker(True)
+        for graph, edge_change in replay_edge_changes(True):
+            tracker.edge_changed(*edge_change)
+        tracker.resync()
+        expected = self.pagerank(graph)
+        for node in graph:
+            self.assertAlmostEqual(tracker.centrality()[node], expected[node], places=6)
+
+
+if __name__ == '__main__':
+    unittest.main()
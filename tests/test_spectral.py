@@ -0,0 +1,50 @@
+import random
+import unittest
+
+import matplotlib
+
+matplotlib.use('Agg')
+# noinspection PyPep8
+import networkx as nx
+# noinspection PyPep8
+import numpy as np
+# noinspection PyPep8
+import network_analysis as neta
+
+
+def spectral_radius(graph, weight='weight'):
+    if not graph.number_of_edges():
+        return 0.0
+    return max(abs(np.linalg.eigvals(nx.to_numpy_matrix(graph, weight=weight))))
+
+
+class SpectralRadiusTest(unittest.TestCase):
+
+    def test_self_loop_outside_component(self):
+        graph = nx.Graph()
+        graph.add_edge('a', 'b', weight=1)
+        graph.add_edge('c', 'c', weight=1)
+        graph.add_edge('c', 'd', weight=2)
+        self.assertAlmostEqual(neta.SpectralRadius(graph, 'weight').update_data(graph), spectral_radius(graph))
+
+    def check_growing_graph(self, graph, number_of_nodes):
+        generator = random.Random(1)
+        spectral_property = neta.SpectralRadius(graph, 'weight')
+        for step in range(4 * number_of_nodes):
+            first_node, second_node = generator.randrange(number_of_nodes), generator.randrange(number_of_nodes)
+            graph.add_edge(first_node, second_node, weight=generator.uniform(.5, 1.5))
+            if step % 10 == 0:
+                # rework on the same machine
+                graph.add_edge(first_node, first_node, weight=1.0)
+            if step % 7 == 0:
+                self.assertAlmostEqual(spectral_property.update_data(graph), spectral_radius(graph), places=6)
+
+    def test_undirected_warm_started(self):
+        self.check_growing_graph(nx.Graph(), 100)
+
+    def test_directed_warm_started(self):
+        self.check_growing_graph(nx.DiGraph(), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
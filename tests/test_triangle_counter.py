@@ -0,0 +1,34 @@
+import unittest
+
+import matplotlib
+
+matplotlib.use('Agg')
+# noinspection PyPep8
+import networkx as nx
+# noinspection PyPep8
+import network_analysis as neta
+# noinspection PyPep8
+from tests.replay import replay_edge_changes
+
+
+class TriangleCounterTest(unittest.TestCase):
+
+    def check_replay(self, directed):
+        triangle_counter = neta.TriangleCounter(directed)
+        for graph, edge_change in replay_edge_changes(directed):
+            triangle_counter.edge_changed(*edge_change)
+            expected = nx.clustering(graph)
+            clustering = triangle_counter.clustering()
+            for node in graph:
+                self.assertAlmostEqual(clustering[node], expected[node], places=12)
+            self.assertAlmostEqual(triangle_counter.average_clustering(), nx.average_clustering(graph), places=12)
+
+    def test_directed(self):
+        self.check_replay(True)
+
+    def test_undirected(self):
+        self.check_replay(False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,352 @@
+"""Array based storage for time series of network properties"""
+
+import math
+
+import numpy as np
+
+
+class GrowableArray(object):
+    """
+    Typed one dimensional array with amortized O(1) append.
+    Slices and values are views on the filled part without copying. A view keeps its content when the array grows,
+    because growing allocates a new buffer.
+    Modifications other than appending are logged with their lowest index (see modified_since), except the ones
+    done through views.
+    """
+
+    def __init__(self, values=None, dtype=np.float64, capacity=64):
+        if values is not None:
+            values = np.asarray(values, dtype=dtype)
+            capacity = max(capacity, len(values))
+        self._buffer = np.empty(capacity, dtype=dtype)
+        self._length = 0
+        # lowest modified index of each modification other than appending
+        self._changes = []
+        if values is not None:
+            self._buffer[:len(values)] = values
+            self._length = len(values)
+
+    def _reserve(self, capacity):
+        if capacity > len(self._buffer):
+            new_capacity = max(capacity, 2 * len(self._buffer), 1)
+            buffer = np.empty(new_capacity, dtype=self._buffer.dtype)
+            buffer[:self._length] = self._buffer[:self._length]
+            self._buffer = buffer
+
+    def append(self, value):
+        if self._length == len(self._buffer):
+            self._reserve(self._length + 1)
+        self._buffer[self._length] = value
+        self._length += 1
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._buffer.dtype)
+        self._reserve(self._length + len(values))
+        self._buffer[self._length:self._length + len(values)] = values
+        self._length += len(values)
+
+    def pop(self):
+        if not self._length:
+            raise IndexError('pop from empty array')
+        self._length -= 1
+        self._changes.append(self._length)
+        return self._buffer[self._length]
+
+    def clear(self):
+        self._length = 0
+        self._changes.append(0)
+
+    @property
+    def number_of_changes(self):
+        return len(self._changes)
+
+    def modified_since(self, number_of_changes):
+        """Return the lowest index modified after the given number of changes or None if nothing was modified"""
+        if number_of_changes >= len(self._changes):
+            return None
+        return min(self._changes[number_of_changes:])
+
+    @property
+    def values(self):
+        """View on all stored values"""
+        return self._buffer[:self._length]
+
+    @property
+    def dtype(self):
+        return self._buffer.dtype
+
+    def copy(self):
+        return GrowableArray(self.values, self.dtype)
+
+    def tolist(self):
+        return self.values.tolist()
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, item):
+        return self.values[item]
+
+    def __setitem__(self, item, value):
+        self.values[item] = value
+        if isinstance(item, slice):
+            self._changes.append(item.indices(self._length)[0])
+        elif isinstance(item, (int, long, np.integer)):
+            self._changes.append(item + self._length if item < 0 else item)
+        else:
+            self._changes.append(0)
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __array__(self, dtype=None):
+        if dtype is None:
+            return self.values
+        return self.values.astype(dtype)
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+
+class TimeSeries(object):
+    """Pair of a time and a value column of the same length, the time column in ascending order"""
+
+    def __init__(self, times=None, values=None):
+        """
+        :type times: GrowableArray
+        :type values: GrowableArray
+        """
+        self.times = times if times is not None else GrowableArray()
+        self.values = values if values is not None else GrowableArray()
+
+    def append(self, time, value):
+        self.times.append(time)
+        self.values.append(value)
+
+    def __len__(self):
+        return min(len(self.times), len(self.values))
+
+    def columns(self):
+        """Views on both columns with the same length"""
+        length = len(self)
+        return self.times[:length], self.values[:length]
+
+    def window(self, start_time, end_time):
+        """Views on both columns for start_time <= time <= end_time"""
+        times, values = self.columns()
+        start = np.searchsorted(times, start_time, 'left')
+        end = np.searchsorted(times, end_time, 'right')
+        return times[start:end], values[start:end]
+
+    def valid(self):
+        """Both columns without the points marked as missing (copies)"""
+        times, values = self.columns()
+        mask = ~np.isnan(values)
+        return times[mask], values[mask]
+
+    def mean(self):
+        return np.nanmean(self.columns()[1]) if len(self) else np.nan
+
+    def std(self):
+        return np.nanstd(self.columns()[1]) if len(self) else np.nan
+
+    def min(self):
+        return np.nanmin(self.columns()[1]) if len(self) else np.nan
+
+    def max(self):
+        return np.nanmax(self.columns()[1]) if len(self) else np.nan
+
+
+class MinMaxDownsampler(object):
+    """
+    Reduce a time series for drawing to the minimum and maximum of buckets of consecutive points, about one bucket
+    per pixel, which keeps the visible envelope of the line.
+
+    The bucket size is a power of two. So the complete buckets are kept while points are appended and are only merged
+    pairwise when the series doubled its length. Modified points of a GrowableArray invalidate the buckets from
+    their index on.
+    """
+
+    def __init__(self):
+        self._values = None
+        self._number_of_changes = 0
+        self._bucket_size = 1
+        # index of the minimum and maximum of each complete bucket, -1 for buckets without any valid point
+        self._minimum_indices = np.empty(0, dtype=np.int64)
+        self._maximum_indices = np.empty(0, dtype=np.int64)
+
+    def downsample(self, times, values, width):
+        """Return times and values of the points to draw, missing points are left out"""
+        length = min(len(times), len(values))
+        if length <= 2 * width:
+            return TimeSeries(times, values).valid()
+
+        bucket_size = 1 << int(math.ceil(math.log(float(length) / width, 2)))
+        if values is not self._values or not hasattr(values, 'modified_since') or bucket_size < self._bucket_size:
+            self._reset(values, bucket_size)
+        else:
+            modified_index = values.modified_since(self._number_of_changes)
+            if modified_index is not None:
+                self._truncate(modified_index // self._bucket_size)
+        if hasattr(values, 'number_of_changes'):
+            self._number_of_changes = values.number_of_changes
+
+        array = np.asarray(values)[:length]
+        while self._bucket_size < bucket_size:
+            self._merge(array)
+
+        start = len(self._minimum_indices) * self._bucket_size
+        end = length // self._bucket_size * self._bucket_size
+        if end > start:
+            minimum_indices, maximum_indices = self._extrema(array[start:end], self._bucket_size, start)
+            self._minimum_indices = np.concatenate([self._minimum_indices, minimum_indices])
+            self._maximum_indices = np.concatenate([self._maximum_indices, maximum_indices])
+
+        # the incomplete last bucket is not cached
+        tail_minimum, tail_maximum = self._extrema(array[end:length], length - end, end)
+        indices = np.column_stack([np.concatenate([self._minimum_indices, tail_minimum]),
+                                   np.concatenate([self._maximum_indices, tail_maximum])])
+        indices = np.sort(indices, axis=1).ravel()
+        indices = indices[indices >= 0]
+        if len(indices):
+            indices = indices[np.concatenate([[True], np.diff(indices) != 0])]
+        return np.asarray(times)[indices], array[indices]
+
+    def _reset(self, values, bucket_size):
+        self._values = values
+        self._bucket_size = bucket_size
+        self._minimum_indices = np.empty(0, dtype=np.int64)
+        self._maximum_indices = np.empty(0, dtype=np.int64)
+
+    def _truncate(self, number_of_buckets):
+        self._minimum_indices = self._minimum_indices[:number_of_buckets]
+        self._maximum_indices = self._maximum_indices[:number_of_buckets]
+
+    def _merge(self, array):
+        """Double the bucket size by merging pairs of buckets"""
+        number_of_pairs = len(self._minimum_indices) // 2
+        self._truncate(2 * number_of_pairs)
+        self._minimum_indices = self._pick(array, self._minimum_indices[0::2], self._minimum_indices[1::2], np.less)
+        self._maximum_indices = self._pick(array, self._maximum_indices[0::2], self._maximum_indices[1::2],
+                                           np.greater)
+        self._bucket_size *= 2
+
+    @staticmethod
+    def _pick(array, first_indices, second_indices, better):
+        """Index of the better value of each pair, ignoring the buckets without valid point"""
+        first_values = array[first_indices]
+        second_values = array[second_indices]
+        take_second = (first_indices < 0) | ((second_indices >= 0) & better(second_values, first_values))
+        return np.where(take_second, second_indices, first_indices)
+
+    @staticmethod
+    def _extrema(array, bucket_size, offset):
+        """Index of minimum and maximum of each bucket of the array, -1 if all values of a bucket are missing"""
+        if not len(array) or not bucket_size:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        buckets = array.reshape(-1, bucket_size).astype(float)
+        missing = np.isnan(buckets)
+        positions = offset + bucket_size * np.arange(len(buckets))
+        minimum_indices = np.where(missing, np.inf, buckets).argmin(axis=1) + positions
+        maximum_indices = np.where(missing, -np.inf, buckets).argmax(axis=1) + positions
+        all_missing = missing.all(axis=1)
+        minimum_indices[all_missing] = -1
+        maximum_indices[all_missing] = -1
+        return minimum_indices, maximum_indices
+
+
+class NodeTimeMatrix(object):
+    """
+    History of a vertex property as matrix with one row per node and one column per point in time.
+
+    Each node keeps the row index of its first appearance, values of nodes which did not exist (yet) are nan.
+    The columns are stored in chunks of fixed size, so appending never copies the history, only new nodes grow
+    the rows of every chunk.
+    """
+
+    def __init__(self, chunk_size=256, node_capacity=16):
+        self.chunk_size = chunk_size
+        self.times = GrowableArray()
+        self.nodes = []
+        self._node_index = {}
+        self._node_capacity = node_capacity
+        self._chunks = []
+
+    def __len__(self):
+        return len(self.times)
+
+    @property
+    def number_of_nodes(self):
+        return len(self.nodes)
+
+    def index_of(self, node):
+        """Row of the node, KeyError for unknown nodes"""
+        return self._node_index[node]
+
+    def _add_node(self, node):
+        index = len(self.nodes)
+        self._node_index[node] = index
+        self.nodes.append(node)
+        if index >= self._node_capacity:
+            self._node_capacity = max(2 * self._node_capacity, index + 1)
+            for i, chunk in enumerate(self._chunks):
+                grown_chunk = np.full((self._node_capacity, self.chunk_size), np.nan)
+                grown_chunk[:len(chunk)] = chunk
+                self._chunks[i] = grown_chunk
+        return index
+
+    def append(self, time, values):
+        """
+        Add the values of the nodes at time as new column
+        :param values: dictionary node -> value, missing nodes are nan
+        """
+        column = len(self.times) % self.chunk_size
+        if column == 0:
+            self._chunks.append(np.full((self._node_capacity, self.chunk_size), np.nan))
+        rows = [self._node_index[node] if node in self._node_index else self._add_node(node) for node in values]
+        self._chunks[-1][rows, column] = list(values.values())
+        self.times.append(time)
+
+    def matrix(self, start=None, end=None):
+        """Copy of the columns [start, end) as array nodes x times"""
+        start, end, _ = slice(start, end).indices(len(self))
+        if start >= end:
+            return np.empty((len(self.nodes), 0))
+        first_chunk, last_chunk = start // self.chunk_size, (end - 1) // self.chunk_size
+        columns = np.hstack(self._chunks[first_chunk:last_chunk + 1])
+        offset = first_chunk * self.chunk_size
+        return columns[:len(self.nodes), start - offset:end - offset]
+
+    def row(self, node):
+        """Copy of all values of the node"""
+        index = self._node_index[node]
+        return np.concatenate([chunk[index] for chunk in self._chunks])[:len(self)] if self._chunks \
+            else np.empty(0)
+
+    def trajectory(self, node):
+        """Time series of the node, nan before its appearance and when it was missing"""
+        return TimeSeries(self.times.copy(), GrowableArray(self.row(node)))
+
+    def latest(self):
+        """Dictionary node -> value of the latest column without the missing nodes"""
+        if not len(self):
+            return {}
+        column = self._chunks[-1][:len(self.nodes), (len(self) - 1) % self.chunk_size]
+        return dict((node, value) for node, value in zip(self.nodes, column.tolist()) if not math.isnan(value))
+
+    def clear(self):
+        self.times = GrowableArray()
+        self.nodes = []
+        self._node_index = {}
+        self._chunks = []
+
+    def save(self, path):
+        """Write the history as .npz (nodes, times, values) or as csv with a column per node"""
+        values = self.matrix()
+        if path.endswith('.npz'):
+            np.savez_compressed(path, nodes=np.array(self.nodes), times=self.times.values, values=values)
+            return
+        with open(path, 'w') as csv_file:
+            csv_file.write(';'.join(['time'] + [str(node) for node in self.nodes]) + '\n')
+            for time, column in zip(self.times.tolist(), values.T.tolist()):
+                csv_file.write(';'.join(repr(value) for value in [time] + column) + '\n')